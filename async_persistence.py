@@ -0,0 +1,201 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Async Persistence Module
+
+asyncio versions of save_character, load_character,
+list_saved_characters and delete_character for servers running on an
+event loop. The file work runs on a small thread pool per save
+directory, so awaiting a save never blocks the loop, and a slow disk only
+ties up the threads of its own directory.
+
+- Same arguments, return values and exceptions as character_manager
+  (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError,
+  SaveLockTimeoutError)
+- At most max_pending calls per store are queued or running, callers
+  beyond that wait their turn without holding a thread
+- Every call takes a timeout (seconds) and raises asyncio.TimeoutError
+  when it runs out. Cancelling a call (or timing out) before its file
+  work started drops it, once started the work finishes in the
+  background since threads can't be interrupted (saves are atomic, so
+  it is all or nothing)
+
+Example:
+    character = await async_persistence.load_character("Hero", timeout=2)
+    await async_persistence.save_character(character)
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import character_manager
+from character_manager import DEFAULT_SAVE_FORMAT
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_PENDING = 256
+
+# ============================================================================
+# ASYNC STORE
+# ============================================================================
+
+def _snapshot(character):
+    """Copy of a character the event loop can keep changing while it is saved"""
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in character.items()}
+
+
+class AsyncCharacterStore:
+    """Runs character_manager's persistence functions on a bounded thread pool"""
+
+    def __init__(self, save_directory="data/save_games", max_workers=DEFAULT_MAX_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, timeout=None):
+        """
+        Args:
+            save_directory: Directory the save files are in
+            max_workers: Threads doing file work at once. Parsing holds
+                         the GIL, so on a fast disk more threads mostly
+                         slow the event loop down, they pay off when
+                         the disk is slow
+            max_pending: Most calls queued or running at once
+            timeout: Default per-call timeout in seconds (None waits forever)
+        """
+        if max_workers < 1 or max_pending < 1:
+            raise ValueError("max_workers and max_pending must be at least 1")
+        self.save_directory = save_directory
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="async-saves")
+        # The semaphore belongs to one event loop, a new loop gets a new one
+        self._loop = None
+        self._semaphore = None
+        self._closed = False
+
+    def _slots(self, loop):
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    async def _call(self, timeout, func, *args):
+        """Run func(*args) on the pool, waiting at most timeout seconds in all"""
+        if self._closed:
+            raise RuntimeError("AsyncCharacterStore is closed")
+        if timeout is None:
+            timeout = self.timeout
+        return await asyncio.wait_for(self._run(func, *args), timeout)
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        semaphore = self._slots(loop)
+        await semaphore.acquire()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def release(_future):
+            #The slot frees up when the thread is done, not when the caller
+            #stops waiting, so cancelled calls still count until they finish
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # Loop already closed
+
+        future.add_done_callback(release)
+        #Cancelling the awaited future cancels the pool job if it hasn't started
+        return await asyncio.wrap_future(future)
+
+    def save_character(self, character, save_format=DEFAULT_SAVE_FORMAT, timeout=None):
+        """
+        Async character_manager.save_character
+
+        Not a coroutine function itself: the character is copied right
+        away, so changes made before the returned coroutine runs don't
+        leak into the save.
+
+        Returns: Awaitable giving True if saved, False if the write failed
+        """
+        return self._call(timeout, character_manager.save_character,
+                          _snapshot(character), self.save_directory, save_format)
+
+    async def load_character(self, character_name, use_cache=False, as_object=False,
+                             timeout=None):
+        """
+        Async character_manager.load_character
+
+        Raises: CharacterNotFoundError, SaveFileCorruptedError,
+                InvalidSaveDataError, SaveLockTimeoutError, asyncio.TimeoutError
+        """
+        return await self._call(timeout, character_manager.load_character, character_name,
+                                self.save_directory, use_cache, as_object)
+
+    async def list_saved_characters(self, timeout=None):
+        """Async character_manager.list_saved_characters"""
+        return await self._call(timeout, character_manager.list_saved_characters,
+                                self.save_directory)
+
+    async def delete_character(self, character_name, timeout=None):
+        """
+        Async character_manager.delete_character
+
+        Raises: CharacterNotFoundError, SaveLockTimeoutError, asyncio.TimeoutError
+        """
+        return await self._call(timeout, character_manager.delete_character, character_name,
+                                self.save_directory)
+
+    def close(self, wait=True):
+        """Stop taking calls and shut the thread pool down"""
+        self._closed = True
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    async def aclose(self):
+        """close() without blocking the event loop while running calls finish"""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+# ============================================================================
+# DEFAULT STORES
+# ============================================================================
+
+_default_stores = {}
+_default_lock = threading.Lock()
+
+
+def get_store(save_directory="data/save_games"):
+    """Shared store for a save directory, created on first use"""
+    with _default_lock:
+        store = _default_stores.get(save_directory)
+        if store is None:
+            store = AsyncCharacterStore(save_directory)
+            _default_stores[save_directory] = store
+        return store
+
+
+def save_character(character, save_directory="data/save_games",
+                   save_format=DEFAULT_SAVE_FORMAT, timeout=None):
+    """Async save_character on the shared store (see AsyncCharacterStore)"""
+    return get_store(save_directory).save_character(character, save_format, timeout)
+
+
+async def load_character(character_name, save_directory="data/save_games", use_cache=False,
+                         as_object=False, timeout=None):
+    """Async load_character on the shared store (see AsyncCharacterStore)"""
+    return await get_store(save_directory).load_character(character_name, use_cache,
+                                                          as_object, timeout)
+
+
+async def list_saved_characters(save_directory="data/save_games", timeout=None):
+    """Async list_saved_characters on the shared store"""
+    return await get_store(save_directory).list_saved_characters(timeout)
+
+
+async def delete_character(character_name, save_directory="data/save_games", timeout=None):
+    """Async delete_character on the shared store"""
+    return await get_store(save_directory).delete_character(character_name, timeout)
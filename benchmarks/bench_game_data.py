@@ -0,0 +1,208 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Game Data Loader Benchmark
+
+Generates synthetic quests.txt/items.txt catalogs and measures how fast
+game_data loads them:
+- blocks/sec for load_quests and load_items
+- peak RSS of the loading process
+- time spent reading, in parse_*_block and in validate_*_data
+
+Results are compared against benchmarks/baseline.json and any case that
+got slower than the allowed tolerance is flagged (exit code 1).
+
+Run: python benchmarks/bench_game_data.py [--sizes 1000,100000,1000000]
+                                          [--tolerance 0.2] [--save-baseline]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+from synthetic_catalog import write_quest_file, write_item_file
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_TOLERANCE = 0.2
+
+# kind -> (file writer, loader, block parser, validator, file label)
+CASES = {
+    "quests": (write_quest_file, game_data.load_quests,
+               game_data.parse_quest_block, game_data.validate_quest_data, "Quest"),
+    "items": (write_item_file, game_data.load_items,
+              game_data.parse_item_block, game_data.validate_item_data, "Item")
+}
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux reports KB, macOS reports bytes
+    if sys.platform == "darwin":
+        return peak / 1e6
+    return peak / 1e3
+
+
+def measure_case(kind, filename):
+    """
+    Measure one catalog file (runs in its own process so RSS is per case)
+
+    Returns: Dictionary of results
+    """
+    _writer, loader, parse_block, validate, label = CASES[kind]
+
+    #Phase breakdown in a single streaming pass
+    parse_time = 0.0
+    validate_time = 0.0
+    blocks = 0
+    started = time.perf_counter()
+    for _line_number, block in game_data._iter_blocks(filename, label):
+        t0 = time.perf_counter()
+        record = parse_block(block)
+        t1 = time.perf_counter()
+        validate(record)
+        t2 = time.perf_counter()
+        parse_time += t1 - t0
+        validate_time += t2 - t1
+        blocks += 1
+    phase_total = time.perf_counter() - started
+
+    #End to end, the way the game calls it
+    started = time.perf_counter()
+    loader(filename)
+    load_time = time.perf_counter() - started
+
+    return {
+        "blocks": blocks,
+        "blocks_per_sec": blocks / load_time if load_time else 0.0,
+        "load_sec": load_time,
+        "read_sec": phase_total - parse_time - validate_time,
+        "parse_sec": parse_time,
+        "validate_sec": validate_time,
+        "peak_rss_mb": _peak_rss_mb()
+    }
+
+
+def run_benchmarks(sizes):
+    """
+    Generate catalogs for each size and measure them
+
+    Returns: Dictionary {"quests/1000": results, ...}
+    """
+    results = {}
+    workdir = tempfile.mkdtemp(prefix="qc_bench_")
+    try:
+        for size in sizes:
+            for kind, (writer, *_rest) in CASES.items():
+                filename = writer(os.path.join(workdir, f"{kind}_{size}.txt"), size)
+                #A fresh process per case keeps peak RSS from leaking between cases
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    results[f"{kind}/{size}"] = pool.submit(measure_case, kind, filename).result()
+                os.remove(filename)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+# ============================================================================
+# BASELINE COMPARISON
+# ============================================================================
+
+def load_baseline(filename=BASELINE_FILE):
+    """Return the stored baseline results, or {} if there isn't one"""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as f:
+        return json.load(f)
+
+
+def save_baseline(results, filename=BASELINE_FILE):
+    """Store results as the new baseline"""
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare results to the baseline
+
+    A case regresses if blocks/sec dropped, or peak RSS grew, by more
+    than tolerance (0.2 = 20%).
+
+    Returns: List of human readable regression messages
+    """
+    regressions = []
+    for case, current in results.items():
+        if case not in baseline:
+            continue
+        old = baseline[case]
+        if current["blocks_per_sec"] < old["blocks_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{case}: {current['blocks_per_sec']:.0f} blocks/sec "
+                f"(baseline {old['blocks_per_sec']:.0f})"
+            )
+        if current["peak_rss_mb"] > old["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{case}: peak RSS {current['peak_rss_mb']:.1f} MB "
+                f"(baseline {old['peak_rss_mb']:.1f} MB)"
+            )
+    return regressions
+
+
+def print_results(results, baseline):
+    """Print a results table with the change against the baseline"""
+    print(f"{'case':>16} {'blocks/s':>10} {'vs base':>8} {'read s':>8} "
+          f"{'parse s':>8} {'valid s':>8} {'RSS MB':>8}")
+    for case, r in results.items():
+        if case in baseline and baseline[case]["blocks_per_sec"]:
+            change = f"{r['blocks_per_sec'] / baseline[case]['blocks_per_sec'] - 1:+.0%}"
+        else:
+            change = "-"
+        print(f"{case:>16} {r['blocks_per_sec']:>10.0f} {change:>8} {r['read_sec']:>8.3f} "
+              f"{r['parse_sec']:>8.3f} {r['validate_sec']:>8.3f} {r['peak_rss_mb']:>8.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game_data loaders")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated entry counts")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed slowdown before a case is flagged")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run_benchmarks(sizes)
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.tolerance)
+    if regressions:
+        print("\nREGRESSIONS:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
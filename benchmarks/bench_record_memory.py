@@ -0,0 +1,72 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Record Memory Benchmark
+
+Compares how much memory a catalog of plain dicts uses against the same
+catalog made of QuestRecord/ItemRecord objects, and live characters as
+dicts against Character objects.
+
+Run: python benchmarks/bench_record_memory.py [sizes...]
+Default sizes are 100000 and 1000000 entries.
+"""
+
+import os
+import sys
+import gc
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_data import QuestRecord, ItemRecord
+from character_manager import create_character
+from synthetic_catalog import make_quest, make_item
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure(build):
+    """Return the bytes still allocated by build() once it returns"""
+    gc.collect()
+    tracemalloc.start()
+    catalog = build()
+    current, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del catalog
+    gc.collect()
+    return current
+
+
+def run(size):
+    """Measure dict and record catalogs of one size"""
+    results = {}
+    for label, make, record_class in (("quests", make_quest, QuestRecord),
+                                      ("items", make_item, ItemRecord)):
+        key = "quest_id" if label == "quests" else "item_id"
+        as_dicts = measure(lambda: {
+            data[key]: data for data in map(make, range(size))
+        })
+        as_records = measure(lambda: {
+            data[key]: record_class(data) for data in map(make, range(size))
+        })
+        results[label] = (as_dicts, as_records)
+
+    classes = ["Warrior", "Mage", "Rogue", "Cleric"]
+    results["characters"] = (
+        measure(lambda: [create_character(f"Hero{i}", classes[i % 4]) for i in range(size)]),
+        measure(lambda: [create_character(f"Hero{i}", classes[i % 4], as_object=True)
+                         for i in range(size)])
+    )
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(f"{'entries':>10} {'kind':>10} {'dict MB':>10} {'record MB':>10} {'saved':>7}")
+    for size in sizes:
+        for label, (as_dicts, as_records) in run(size).items():
+            saved = 1 - as_records / as_dicts
+            print(f"{size:>10} {label:>10} {as_dicts / 1e6:>10.1f} "
+                  f"{as_records / 1e6:>10.1f} {saved:>7.0%}")
@@ -0,0 +1,95 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Format Benchmark
+
+Compares the text and binary save formats for characters with large
+inventories and quest histories: save and load latency and file size.
+
+Run: python benchmarks/bench_save_format.py [sizes...] [--repeat 50]
+Sizes are the number of inventory items and completed quests per
+character (default 10, 1000 and 100000).
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+DEFAULT_REPEAT = 50
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def make_character(size):
+    """Character with size inventory items and size completed quests"""
+    character = character_manager.create_character(f"Bench{size}", "Warrior")
+    character["level"] = 40
+    character["experience"] = 123_456
+    character["gold"] = 9_876_543
+    character["inventory"] = [f"item_{i:06d}" for i in range(size)]
+    character["completed_quests"] = [f"quest_{i:06d}" for i in range(size)]
+    character["active_quests"] = [f"quest_{i:06d}" for i in range(size, size + 5)]
+    character["equipped_weapon"] = "item_000000"
+    return character
+
+
+def _best_of(repeat, func):
+    """Fastest of repeat runs of func() in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure(size, save_format, save_directory, repeat=DEFAULT_REPEAT):
+    """
+    Time save_character/load_character for one size and format
+
+    Returns: Dictionary with save_ms, load_ms and file_bytes
+    """
+    character = make_character(size)
+    name = character["name"]
+
+    save_time = _best_of(repeat, lambda: character_manager.save_character(
+        character, save_directory, save_format))
+    load_time = _best_of(repeat, lambda: character_manager.load_character(name, save_directory))
+    assert character_manager.load_character(name, save_directory) == character
+
+    return {
+        "save_ms": save_time * 1000,
+        "load_ms": load_time * 1000,
+        "file_bytes": os.path.getsize(os.path.join(save_directory, f"{name}_save.txt"))
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark text vs binary saves")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    save_directory = tempfile.mkdtemp(prefix="qc_saves_")
+    try:
+        print(f"{'entries':>8} {'format':>7} {'save ms':>9} {'load ms':>9} {'bytes':>10}")
+        for size in args.sizes:
+            for save_format in character_manager.SAVE_FORMATS:
+                r = measure(size, save_format, save_directory, args.repeat)
+                print(f"{size:>8} {save_format:>7} {r['save_ms']:>9.3f} "
+                      f"{r['load_ms']:>9.3f} {r['file_bytes']:>10}")
+    finally:
+        shutil.rmtree(save_directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Synthetic Catalog Generator
+
+Writes quests.txt and items.txt files of any size in the exact format
+game_data parses, for benchmarks and load testing.
+
+Run: python benchmarks/synthetic_catalog.py <output_dir> <entries>
+"""
+
+import os
+import sys
+
+# Order of the lines inside each block, matching data/quests.txt and data/items.txt
+QUEST_KEYS = ["quest_id", "title", "description", "reward_xp",
+              "reward_gold", "required_level", "prerequisite"]
+ITEM_KEYS = ["item_id", "name", "type", "effect", "cost", "description"]
+
+ITEM_TYPES = ("weapon", "armor", "consumable")
+EFFECT_STATS = {"weapon": "strength", "armor": "max_health", "consumable": "health"}
+
+# ============================================================================
+# SYNTHETIC ENTRIES
+# ============================================================================
+
+def make_quest(i):
+    """Build one quest dict shaped like parse_quest_block output"""
+    return {
+        "quest_id": f"quest_{i}",
+        "title": f"Quest {i}",
+        "description": "Defeat the monsters troubling the village",
+        "reward_xp": 50 + i % 500,
+        "reward_gold": 25 + i % 250,
+        "required_level": 1 + i % 20,
+        "prerequisite": "NONE" if i == 0 else f"quest_{i - 1}"
+    }
+
+
+def make_item(i):
+    """Build one item dict shaped like parse_item_block output"""
+    item_type = ITEM_TYPES[i % 3]
+    return {
+        "item_id": f"item_{i}",
+        "name": f"Item {i}",
+        "type": item_type,
+        "effect": f"{EFFECT_STATS[item_type]}:{1 + i % 10}",
+        "cost": 10 + i % 500,
+        "description": "A useful piece of equipment"
+    }
+
+# ============================================================================
+# FILE WRITERS
+# ============================================================================
+
+def _write_blocks(filename, count, make, keys):
+    """Write count blocks of KEY: VALUE lines separated by blank lines"""
+    with open(filename, "w") as f:
+        for i in range(count):
+            entry = make(i)
+            f.write("".join(f"{key.upper()}: {entry[key]}\n" for key in keys))
+            f.write("\n")
+    return filename
+
+
+def write_quest_file(filename, count):
+    """Write a quests.txt with count quests"""
+    return _write_blocks(filename, count, make_quest, QUEST_KEYS)
+
+
+def write_item_file(filename, count):
+    """Write an items.txt with count items"""
+    return _write_blocks(filename, count, make_item, ITEM_KEYS)
+
+
+def write_catalogs(directory, count):
+    """
+    Write quests.txt and items.txt with count entries each into directory
+    
+    Returns: Tuple of (quest_file, item_file)
+    """
+    os.makedirs(directory, exist_ok=True)
+    quest_file = write_quest_file(os.path.join(directory, "quests.txt"), count)
+    item_file = write_item_file(os.path.join(directory, "items.txt"), count)
+    return quest_file, item_file
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python benchmarks/synthetic_catalog.py <output_dir> <entries>")
+        sys.exit(1)
+    quest_file, item_file = write_catalogs(sys.argv[1], int(sys.argv[2]))
+    print(f"Wrote {quest_file} and {item_file}")
@@ -0,0 +1,252 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Catalog Store Module
+
+This module compiles quests.txt and items.txt into a SQLite database and
+reads it back through the same mapping interface as load_quests and
+load_items, plus indexed queries that quest_handler and the shop use to
+push their filters into SQL.
+
+Run: python catalog_store.py <db_file> [quests_file] [items_file]
+"""
+
+import os
+import sys
+import sqlite3
+import threading
+from collections.abc import Mapping
+
+import game_data
+from custom_exceptions import MissingDataFileError, CorruptedDataError
+
+QUEST_COLUMNS = ["quest_id", "title", "description", "reward_xp",
+                 "reward_gold", "required_level", "prerequisite"]
+ITEM_COLUMNS = ["item_id", "name", "type", "effect", "cost", "description"]
+
+SCHEMA = """
+CREATE TABLE quests (
+    quest_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    reward_xp INTEGER NOT NULL,
+    reward_gold INTEGER NOT NULL,
+    required_level INTEGER NOT NULL,
+    prerequisite TEXT NOT NULL
+);
+CREATE INDEX quests_required_level ON quests (required_level);
+CREATE INDEX quests_prerequisite ON quests (prerequisite);
+
+CREATE TABLE items (
+    item_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    effect TEXT NOT NULL,
+    cost INTEGER NOT NULL,
+    description TEXT NOT NULL
+);
+CREATE INDEX items_type_cost ON items (type, cost);
+CREATE INDEX items_cost ON items (cost);
+"""
+
+# ============================================================================
+# COMPILER
+# ============================================================================
+
+def _upsert_sql(table, columns):
+    """INSERT that keeps the first position of a repeated ID (like a dict)"""
+    key = columns[0]
+    updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:])
+    return (f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {updates}")
+
+
+def compile_catalog_db(db_file="data/catalog.db", quest_file="data/quests.txt",
+                       item_file="data/items.txt"):
+    """
+    Build a SQLite catalog from the text data files
+
+    Every block is validated by game_data on the way in. The database is
+    written to a temp file and renamed, so readers never see a partial one.
+
+    Returns: Dictionary with how many quests and items were stored
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    temp_file = f"{db_file}.{os.getpid()}.tmp"
+    if os.path.exists(temp_file):
+        os.remove(temp_file)
+
+    connection = sqlite3.connect(temp_file)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            _upsert_sql("quests", QUEST_COLUMNS),
+            ([quest[column] for column in QUEST_COLUMNS]
+             for quest in game_data.iter_quests(quest_file))
+        )
+        connection.executemany(
+            _upsert_sql("items", ITEM_COLUMNS),
+            ([item[column] for column in ITEM_COLUMNS]
+             for item in game_data.iter_items(item_file))
+        )
+        connection.commit()
+        counts = {
+            "quests": connection.execute("SELECT COUNT(*) FROM quests").fetchone()[0],
+            "items": connection.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        }
+    except Exception:
+        connection.close()
+        os.remove(temp_file)
+        raise
+    connection.close()
+    os.replace(temp_file, db_file)
+    return counts
+
+# ============================================================================
+# READ-ONLY CATALOGS
+# ============================================================================
+
+class _SQLiteCatalog(Mapping):
+    """
+    Read-only catalog backed by a compiled SQLite file
+
+    One read-only connection is shared by every thread, queries on it
+    are serialized with a lock.
+    """
+
+    TABLE = None
+    COLUMNS = None
+
+    def __init__(self, db_file="data/catalog.db"):
+        """
+        Raises: MissingDataFileError if db_file doesn't exist
+                CorruptedDataError if it can't be opened
+        """
+        if not os.path.exists(db_file):
+            raise MissingDataFileError(f"Catalog database is not found: {db_file}")
+        try:
+            self._connection = sqlite3.connect(
+                f"file:{os.path.abspath(db_file)}?mode=ro",
+                uri=True,
+                check_same_thread=False
+            )
+            self._connection.execute(f"SELECT 1 FROM {self.TABLE} LIMIT 1")
+        except sqlite3.DatabaseError:
+            raise CorruptedDataError(f"Catalog database is unreadable: {db_file}")
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._select = f"SELECT {', '.join(self.COLUMNS)} FROM {self.TABLE}"
+        self._key = self.COLUMNS[0]
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    def _to_dict(self, row):
+        return dict(zip(self.COLUMNS, row))
+
+    def _find(self, where, params, order="rowid"):
+        """Run a filtered SELECT and return a list of record dicts"""
+        sql = self._select
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        return [self._to_dict(row) for row in self._query(sql, params)]
+
+    def __getitem__(self, key):
+        rows = self._query(f"{self._select} WHERE {self._key} = ?", (key,))
+        if not rows:
+            raise KeyError(key)
+        return self._to_dict(rows[0])
+
+    def __contains__(self, key):
+        return bool(self._query(f"SELECT 1 FROM {self.TABLE} WHERE {self._key} = ?", (key,)))
+
+    def __iter__(self):
+        rows = self._query(f"SELECT {self._key} FROM {self.TABLE} ORDER BY rowid")
+        return iter([row[0] for row in rows])
+
+    def __len__(self):
+        return self._query(f"SELECT COUNT(*) FROM {self.TABLE}")[0][0]
+
+    def values(self):
+        #One query instead of a lookup per key
+        return self._find([], ())
+
+    def items(self):
+        return [(record[self._key], record) for record in self.values()]
+
+    def close(self):
+        """Close the shared connection"""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class QuestStore(_SQLiteCatalog):
+    """Quest catalog in SQLite, usable as a quest_data_dict"""
+
+    TABLE = "quests"
+    COLUMNS = QUEST_COLUMNS
+
+    def query_quests(self, min_level=None, max_level=None, prerequisite=None):
+        """
+        Find quests using the required_level and prerequisite indexes
+
+        Returns: List of quest dictionaries in catalog order
+        """
+        where = []
+        params = []
+        if min_level is not None:
+            where.append("required_level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            where.append("required_level <= ?")
+            params.append(max_level)
+        if prerequisite is not None:
+            where.append("prerequisite = ?")
+            params.append(prerequisite)
+        return self._find(where, params)
+
+
+class ItemStore(_SQLiteCatalog):
+    """Item catalog in SQLite, usable as an item_data_dict"""
+
+    TABLE = "items"
+    COLUMNS = ITEM_COLUMNS
+
+    def _to_dict(self, row):
+        item = dict(zip(self.COLUMNS, row))
+        item["effects"] = game_data.compile_item_effects(item["effect"])
+        return item
+
+    def query_items(self, item_type=None, min_cost=None, max_cost=None):
+        """
+        Find items using the type and cost indexes
+
+        Returns: List of item dictionaries in catalog order
+        """
+        where = []
+        params = []
+        if item_type is not None:
+            where.append("type = ?")
+            params.append(item_type)
+        if min_cost is not None:
+            where.append("cost >= ?")
+            params.append(min_cost)
+        if max_cost is not None:
+            where.append("cost <= ?")
+            params.append(max_cost)
+        return self._find(where, params)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python catalog_store.py <db_file> [quests_file] [items_file]")
+        sys.exit(1)
+    counts = compile_catalog_db(*sys.argv[1:4])
+    print(f"Stored {counts['quests']} quests and {counts['items']} items in {sys.argv[1]}")
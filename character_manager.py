@@ -10,20 +10,175 @@ raising errors because of formatting issues.]
 This module handles character creation, loading, and saving.
 """
 
+import io
 import os
+import sys
+import json
+import math
+import bisect
+import zlib
+import struct
+import threading
+import functools
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+
+import save_locks
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
     SaveFileCorruptedError,
     InvalidSaveDataError,
-    CharacterDeadError
+    CharacterDeadError,
+    SaveLockTimeoutError
 )
 
+# ============================================================================
+# BINARY SAVE FORMAT
+# ============================================================================
+
+# Binary saves start with this, so load_character can tell them from text saves
+BINARY_SAVE_MAGIC = b"QCSAVE"
+BINARY_SAVE_VERSION = 1
+SAVE_FORMATS = ("text", "binary")
+DEFAULT_SAVE_FORMAT = "text"
+
+# magic, version, CRC32 of the body, body length
+_BINARY_HEADER = struct.Struct("<6sHII")
+# level, health, max_health, strength, magic, experience, gold
+_BINARY_STATS = struct.Struct("<7q")
+_BINARY_STATS_FIELDS = ("level", "health", "max_health", "strength", "magic",
+                        "experience", "gold")
+# Strings are a byte length then UTF-8, lists are a count, a byte length
+# and the ids joined with NUL
+_BINARY_LENGTH = struct.Struct("<I")
+_BINARY_LIST = struct.Struct("<II")
+_BINARY_LIST_FIELDS = ("inventory", "active_quests", "completed_quests")
+
+
+def pack_character_save(character):
+    """
+    Build a binary (version 1) save file for a character
+    
+    Layout after the header: name, class, the seven numbers as 64-bit
+    ints, the three id lists, then equipped weapon and armor (empty
+    string for None).
+    
+    Returns: bytes
+    Raises: ValueError if an id contains a NUL character
+    """
+    parts = []
+
+    def add_string(value):
+        data = (value or "").encode("utf-8")
+        parts.append(_BINARY_LENGTH.pack(len(data)))
+        parts.append(data)
+
+    add_string(character['name'])
+    add_string(character['class'])
+    parts.append(_BINARY_STATS.pack(*[character[field] for field in _BINARY_STATS_FIELDS]))
+    for field in _BINARY_LIST_FIELDS:
+        ids = character[field]
+        data = "\0".join(ids).encode("utf-8")
+        if data.count(b"\0") != max(len(ids) - 1, 0):
+            raise ValueError(f"{field} ids can't contain NUL characters")
+        parts.append(_BINARY_LIST.pack(len(ids), len(data)))
+        parts.append(data)
+    add_string(character['equipped_weapon'])
+    add_string(character['equipped_armor'])
+
+    body = b"".join(parts)
+    header = _BINARY_HEADER.pack(BINARY_SAVE_MAGIC, BINARY_SAVE_VERSION,
+                                 zlib.crc32(body), len(body))
+    return header + body
+
+
+def unpack_character_save(data, character_name):
+    """
+    Read a binary save file back into a character dictionary
+    
+    Raises: SaveFileCorruptedError if the file is cut off or fails its checksum
+            InvalidSaveDataError if it is from an unknown format version
+    """
+    corrupted = SaveFileCorruptedError(f"Save file for character '{character_name}' is corrupted.")
+    if len(data) < _BINARY_HEADER.size:
+        raise corrupted
+    magic, version, checksum, length = _BINARY_HEADER.unpack_from(data, 0)
+    if magic != BINARY_SAVE_MAGIC:
+        raise corrupted
+    if version != BINARY_SAVE_VERSION:
+        raise InvalidSaveDataError(
+            f"Save file for '{character_name}' has unsupported version {version}.")
+    body = data[_BINARY_HEADER.size:]
+    if len(body) != length or zlib.crc32(body) != checksum:
+        raise corrupted
+
+    try:
+        offset = 0
+
+        def read_string():
+            nonlocal offset
+            size = _BINARY_LENGTH.unpack_from(body, offset)[0]
+            offset += _BINARY_LENGTH.size
+            value = body[offset:offset + size].decode("utf-8")
+            offset += size
+            return value
+
+        character = {"name": read_string(), "class": read_string()}
+        character.update(zip(_BINARY_STATS_FIELDS, _BINARY_STATS.unpack_from(body, offset)))
+        offset += _BINARY_STATS.size
+        for field in _BINARY_LIST_FIELDS:
+            count, size = _BINARY_LIST.unpack_from(body, offset)
+            offset += _BINARY_LIST.size
+            ids = body[offset:offset + size].decode("utf-8").split("\0") if count else []
+            offset += size
+            if len(ids) != count:
+                raise corrupted
+            character[field] = ids
+        character["equipped_weapon"] = read_string() or None
+        character["equipped_armor"] = read_string() or None
+    except (struct.error, UnicodeDecodeError):
+        raise corrupted
+    if offset != len(body):
+        raise corrupted
+    return character
+
+
+def encode_character_save(character, save_format=DEFAULT_SAVE_FORMAT):
+    """
+    Build a save file in the given format
+    
+    Returns: str for "text", bytes for "binary"
+    Raises: ValueError for an unknown format
+    """
+    if save_format == "text":
+        return format_character_save(character)
+    if save_format == "binary":
+        return pack_character_save(character)
+    raise ValueError(f"Unknown save format: {save_format}")
+
+
+def convert_save(character_name, save_format, save_directory="data/save_games"):
+    """
+    Rewrite a character's save file in another format
+    
+    Any journal is folded in, since the character is loaded first.
+    
+    Returns: True if converted
+    Raises: the load_character exceptions, OSError if the write fails
+    """
+    with save_locks.character_lock(character_name, save_directory, exclusive=True):
+        character = load_character(character_name, save_directory)
+        _write_character_save(character, save_directory,
+                              encode_character_save(character, save_format))
+        remove_journal(character_name, save_directory)
+    return True
+
 # ============================================================================
 # CHARACTER MANAGEMENT FUNCTIONS
 # ============================================================================
 
-def create_character(name, character_class):
+def create_character(name, character_class, as_object=False):
     """
     Create a new character with stats based on class
     
@@ -32,6 +187,7 @@ def create_character(name, character_class):
     Returns: Dictionary with character data including:
             - name, class, level, health, max_health, strength, magic
             - experience, gold, inventory, active_quests, completed_quests
+            (a Character object instead if as_object is True)
     
     Raises: InvalidCharacterClassError if class is not valid
     """
@@ -74,6 +230,8 @@ def create_character(name, character_class):
         "equipped_armor": None        
     }
 
+    if as_object:
+        return Character(character)
     return character
     # TODO: Implement character creation
     # Validate character_class first
@@ -90,11 +248,13 @@ def create_character(name, character_class):
     # Raise InvalidCharacterClassError if class not in valid list
     
 
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory="data/save_games", save_format=DEFAULT_SAVE_FORMAT):
     """
     Save character to file
     
     Filename format: {character_name}_save.txt
+    save_format: "text" (below) or "binary" (see pack_character_save),
+                 load_character reads either one
     
     File format:
     NAME: character_name
@@ -112,52 +272,29 @@ def save_character(character, save_directory="data/save_games"):
     EQUIPPED_WEAPON: weapon_id
     EQUIPPED_ARMOR: armor_id
     
-    Returns: True if successful
+    Other servers sharing the save directory can't read or write the
+    character while it is being saved (see save_locks).
+    
+    Returns: True if successful (False if the write failed or the
+             character stayed locked past the lock timeout)
     Raises: PermissionError, IOError (let them propagate or handle)
     """
     #Verifies there is a directory to save the file in
     os.makedirs(save_directory, exist_ok=True)
-    filename = f"{character['name']}_save.txt"
-    filepath = os.path.join(save_directory, filename)
-
-    # Converts lists to comma-separated strings
-    inventory = ",".join(character['inventory'])
-    active_quests = ",".join(character['active_quests'])
-    completed_quests = ",".join(character['completed_quests'])
-    
-    # Handle equipped items (they might be None)
-    # Helps with formatting issues
-    if character['equipped_weapon'] is None:
-        equipped_weapon = ''
-    else:
-        equipped_weapon = character['equipped_weapon']
-        
-    if character['equipped_armor'] is None:
-        equipped_armor = ''
-    else:
-        equipped_armor = character['equipped_armor']
 
     try:
-        with open(filepath, 'w') as f:
-            # Use a space for empty values to ensure format is always "KEY: VALUE"
-            #Helps with formatting so there are no errors
-            f.write(f"NAME: {character['name']}\n")
-            f.write(f"CLASS: {character['class']}\n")
-            f.write(f"LEVEL: {character['level']}\n")
-            f.write(f"HEALTH: {character['health']}\n")
-            f.write(f"MAX_HEALTH: {character['max_health']}\n")
-            f.write(f"STRENGTH: {character['strength']}\n")
-            f.write(f"MAGIC: {character['magic']}\n")
-            f.write(f"EXPERIENCE: {character['experience']}\n")
-            f.write(f"GOLD: {character['gold']}\n")
-            f.write(f"INVENTORY: {inventory if inventory else ' '}\n")
-            f.write(f"ACTIVE_QUESTS: {active_quests if active_quests else ' '}\n")
-            f.write(f"COMPLETED_QUESTS: {completed_quests if completed_quests else ' '}\n")
-            f.write(f"EQUIPPED_WEAPON: {equipped_weapon if equipped_weapon else ' '}\n")
-            f.write(f"EQUIPPED_ARMOR: {equipped_armor if equipped_armor else ' '}\n")
+        with save_locks.character_lock(character['name'], save_directory, exclusive=True):
+            _write_character_save(character, save_directory,
+                                  encode_character_save(character, save_format))
+            #The snapshot has everything the journal had
+            remove_journal(character['name'], save_directory)
+            journal = attached_journal(character, save_directory)
+            if journal is not None:
+                journal.rebase(journal.mark())
+            character_cache.put(character, save_directory)
         return True
     
-    #Handles both IOError and PermissionError
+    #Handles both IOError and PermissionError (and SaveLockTimeoutError)
     except (IOError, PermissionError) as e:
         print(f"Error saving character: {e}")
         return False
@@ -169,19 +306,84 @@ def save_character(character, save_directory="data/save_games"):
     # Lists should be saved as comma-separated values
     
 
-def load_character(character_name, save_directory="data/save_games"):
+def format_character_save(character):
     """
-    Load character from save file
+    Build the whole save file text for a character in one string
     
-    Args:
-        character_name: Name of character to load
-        save_directory: Directory containing save files
+    Returns: Save file contents (see save_character for the format)
+    """
+    # Converts lists to comma-separated strings
+    inventory = ",".join(character['inventory'])
+    active_quests = ",".join(character['active_quests'])
+    completed_quests = ",".join(character['completed_quests'])
     
-    Returns: Character dictionary
-    Raises: 
+    # Handle equipped items (they might be None)
+    # Helps with formatting issues
+    equipped_weapon = character['equipped_weapon'] or ''
+    equipped_armor = character['equipped_armor'] or ''
+
+    # Use a space for empty values to ensure format is always "KEY: VALUE"
+    #Helps with formatting so there are no errors
+    return (
+        f"NAME: {character['name']}\n"
+        f"CLASS: {character['class']}\n"
+        f"LEVEL: {character['level']}\n"
+        f"HEALTH: {character['health']}\n"
+        f"MAX_HEALTH: {character['max_health']}\n"
+        f"STRENGTH: {character['strength']}\n"
+        f"MAGIC: {character['magic']}\n"
+        f"EXPERIENCE: {character['experience']}\n"
+        f"GOLD: {character['gold']}\n"
+        f"INVENTORY: {inventory if inventory else ' '}\n"
+        f"ACTIVE_QUESTS: {active_quests if active_quests else ' '}\n"
+        f"COMPLETED_QUESTS: {completed_quests if completed_quests else ' '}\n"
+        f"EQUIPPED_WEAPON: {equipped_weapon if equipped_weapon else ' '}\n"
+        f"EQUIPPED_ARMOR: {equipped_armor if equipped_armor else ' '}\n"
+    )
+
+
+def write_save_file(filepath, text):
+    """
+    Write a save file atomically
+    
+    The text (or bytes, for binary saves) goes to a temp file that is
+    fsynced and then renamed over the old save, so a crash leaves either
+    the old or the new save.
+    
+    Raises: OSError (IOError, PermissionError) if the write fails
+    """
+    temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb' if isinstance(text, bytes) else 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, filepath)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _write_character_save(character, save_directory, data):
+    """Write a character's save file and update the save manifest"""
+    #Imported here so plain imports of character_manager don't pay for
+    #sqlite3 at startup
+    import save_manifest
+
+    previous_mtime = save_manifest.directory_mtime(save_directory)
+    write_save_file(os.path.join(save_directory, f"{character['name']}_save.txt"), data)
+    save_manifest.record_save(character, save_directory, previous_mtime)
+
+
+def read_save_data(character_name, save_directory="data/save_games"):
+    """
+    Read a character's save file without parsing it
+    
+    Returns: bytes
+    Raises:
         CharacterNotFoundError if save file doesn't exist
         SaveFileCorruptedError if file exists but can't be read
-        InvalidSaveDataError if data format is wrong
     """
     #Verifies the file exists
     filename = f"{character_name}_save.txt"
@@ -190,14 +392,43 @@ def load_character(character_name, save_directory="data/save_games"):
     #Raises CharacterNotFoundError if the file does not exist
     if not os.path.exists(filepath):
         raise CharacterNotFoundError(f"Character '{character_name}' not found.")
-    
+
     #Tries to read the file, raises SaveFileCorruptedError if it cannot
     try:
-        with open(filepath, "r") as file:
-            lines = file.readlines()
-    except:
+        with open(filepath, "rb") as file:
+            return file.read()
+    except OSError:
         raise SaveFileCorruptedError(f"Save file for character '{character_name}' is corrupted.")
+
+
+def parse_save_data(data, character_name):
+    """
+    Turn the bytes of a save file (text or binary) into a character dictionary
+    
+    Doesn't touch the disk, so it can run in another process.
     
+    Raises:
+        SaveFileCorruptedError if the file can't be decoded
+        InvalidSaveDataError if data format is wrong
+    """
+    #Binary saves are told apart by their header, anything else is a text save
+    if data.startswith(BINARY_SAVE_MAGIC):
+        return unpack_character_save(data, character_name)
+
+    #Decoded the same way open(filepath, "r") would (locale encoding, universal newlines)
+    try:
+        lines = io.TextIOWrapper(io.BytesIO(data)).read().split("\n")
+    except (UnicodeDecodeError, LookupError):
+        raise SaveFileCorruptedError(f"Save file for character '{character_name}' is corrupted.")
+    try:
+        return _parse_text_save(lines, character_name)
+    except (KeyError, ValueError):
+        #Missing fields or numbers that aren't numbers
+        raise InvalidSaveDataError(f"Invalid data format in save file for '{character_name}'.")
+
+
+def _parse_text_save(lines, character_name):
+    """Parse the KEY: VALUE lines of a text save"""
     character = {}
 
 #Parses the file line by line into a dictionary, raises InvalidSaveDataError if the format is wrong
@@ -256,7 +487,7 @@ def load_character(character_name, save_directory="data/save_games"):
 
     #Sets the dictionary up to how I want it to be returned
     #So it doesn't convert everything to a string or mess up how the dict is formatted
-    character_dict = {
+    return {
         "name": character["NAME"],
         "class": character["CLASS"],
         "level": int(character["LEVEL"]),
@@ -272,6 +503,37 @@ def load_character(character_name, save_directory="data/save_games"):
         "equipped_weapon": equipped_weapon,
         "equipped_armor": equipped_armor
     }
+
+
+def load_character(character_name, save_directory="data/save_games", use_cache=False,
+                   as_object=False):
+    """
+    Load character from save file
+    
+    Args:
+        character_name: Name of character to load
+        save_directory: Directory containing save files
+        use_cache: Go through character_cache, which skips reading and
+                   parsing when the save file hasn't changed
+        as_object: Return a Character object instead of a dictionary
+    
+    Returns: Character dictionary
+    Raises: 
+        CharacterNotFoundError if save file doesn't exist
+        SaveFileCorruptedError if file exists but can't be read
+        InvalidSaveDataError if data format is wrong
+        SaveLockTimeoutError if a writer held the character too long
+    """
+    if use_cache:
+        character_dict = character_cache.load(character_name, save_directory)
+    else:
+        #Shared lock so the save file and journal are read from the same save
+        with save_locks.character_lock(character_name, save_directory):
+            data = read_save_data(character_name, save_directory)
+            character_dict = parse_save_data(data, character_name)
+            replay_journal(character_dict, save_directory)
+    if as_object:
+        return Character(character_dict)
     return character_dict
         
     # TODO: Implement load functionality
@@ -289,17 +551,10 @@ def list_saved_characters(save_directory="data/save_games"):
     #Makes sure the directory exists
     if not os.path.exists(save_directory):
         return []
-    #Puts all the files in one spot
-    files = os.listdir(save_directory)
-    #Creates the empty list to hold the names
-    character_names = []
-    #Goes through the files and adds the names to the list
-    for file in files:
-        if file.endswith("_save.txt"):
-            character_name = file[:-9]  # Remove '_save.txt'
-            #Adds the name to the list without txt
-            character_names.append(character_name)
-    return character_names
+    import save_manifest
+
+    #The save manifest has every name, so the directory isn't scanned
+    return save_manifest.list_names(save_directory)
     # TODO: Implement this function
     # Return empty list if directory doesn't exist
     # Extract character names from filenames
@@ -311,6 +566,7 @@ def delete_character(character_name, save_directory="data/save_games"):
     
     Returns: True if deleted successfully
     Raises: CharacterNotFoundError if character doesn't exist
+            SaveLockTimeoutError if the character stayed locked too long
     """
     #Calls the file path to a variable
     filename = f"{character_name}_save.txt"
@@ -320,17 +576,765 @@ def delete_character(character_name, save_directory="data/save_games"):
     if not os.path.exists(filepath):
         raise CharacterNotFoundError(f"Character '{character_name}' not found.")
     #This is the deleting function of the file
-    os.remove(filepath)
+    with save_locks.character_lock(character_name, save_directory, exclusive=True):
+        import save_manifest
+
+        previous_mtime = save_manifest.directory_mtime(save_directory)
+        try:
+            os.remove(filepath)
+        except FileNotFoundError:
+            #Another server deleted it while we waited for the lock
+            raise CharacterNotFoundError(f"Character '{character_name}' not found.")
+        remove_journal(character_name, save_directory)
+        save_manifest.remove_save(character_name, save_directory, previous_mtime)
+        character_cache.invalidate(character_name, save_directory)
 
     return True
     # TODO: Implement character deletion
     # Verify file exists before attempting deletion
     
 
+# ============================================================================
+# BULK LOADING
+# ============================================================================
+
+# Errors that belong to one character and don't stop a bulk load
+LOAD_ERRORS = (CharacterNotFoundError, SaveFileCorruptedError, InvalidSaveDataError,
+               SaveLockTimeoutError)
+DEFAULT_LOAD_WORKERS = 8
+
+
+def _load_with_pool(character_name, save_directory, parse_pool):
+    """load_character, with the parsing optionally sent to a process pool"""
+    with save_locks.character_lock(character_name, save_directory):
+        data = read_save_data(character_name, save_directory)
+        if parse_pool is None:
+            character = parse_save_data(data, character_name)
+        else:
+            character = parse_pool.submit(parse_save_data, data, character_name).result()
+        replay_journal(character, save_directory)
+    return character
+
+
+def iter_load_characters(names, save_directory="data/save_games", workers=DEFAULT_LOAD_WORKERS,
+                         processes=0, ordered=True):
+    """
+    Load many characters in parallel
+    
+    Threads do the file reads, and with processes > 0 the parsing runs in
+    a process pool of that size. Only a few loads per worker are in
+    flight at once, so any number of names is fine.
+    
+    Args:
+        names: Character names to load
+        workers: Reader threads
+        processes: Parser processes (0 parses in the reader threads)
+        ordered: True yields in the order of names, False as they finish
+    
+    Yields: (name, character, error) - character is None and error is the
+            CharacterNotFoundError / SaveFileCorruptedError /
+            InvalidSaveDataError / SaveLockTimeoutError if that character
+            couldn't be loaded
+    """
+    #Imported here so plain load_character doesn't pay for them at startup
+    from collections import deque
+    from concurrent.futures import (ThreadPoolExecutor, ProcessPoolExecutor,
+                                    wait, FIRST_COMPLETED)
+
+    def outcome(future):
+        try:
+            return future.result(), None
+        except LOAD_ERRORS as e:
+            return None, e
+
+    names = iter(names)
+    window = max(workers, 1) * 4
+    parse_pool = ProcessPoolExecutor(max_workers=processes) if processes else None
+    read_pool = ThreadPoolExecutor(max_workers=max(workers, 1))
+    try:
+        def submit_next():
+            name = next(names, None)
+            if name is None:
+                return None
+            return name, read_pool.submit(_load_with_pool, name, save_directory, parse_pool)
+
+        if ordered:
+            in_flight = deque()
+            while True:
+                while len(in_flight) < window:
+                    submitted = submit_next()
+                    if submitted is None:
+                        break
+                    in_flight.append(submitted)
+                if not in_flight:
+                    return
+                name, future = in_flight.popleft()
+                yield (name, *outcome(future))
+        else:
+            in_flight = {}
+            while True:
+                while len(in_flight) < window:
+                    submitted = submit_next()
+                    if submitted is None:
+                        break
+                    in_flight[submitted[1]] = submitted[0]
+                if not in_flight:
+                    return
+                done, _pending = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield (in_flight.pop(future), *outcome(future))
+    finally:
+        read_pool.shutdown(cancel_futures=True)
+        if parse_pool is not None:
+            parse_pool.shutdown(cancel_futures=True)
+
+
+def load_characters(names, save_directory="data/save_games", workers=DEFAULT_LOAD_WORKERS,
+                    processes=0, ordered=True):
+    """
+    Load many characters in parallel (see iter_load_characters)
+    
+    Returns: Tuple of (characters, errors)
+             characters: {name: character dictionary}, in the order of
+                         names (or the order they finished if not ordered)
+             errors: {name: exception} for every character that failed
+    """
+    characters = {}
+    errors = {}
+    for name, character, error in iter_load_characters(names, save_directory, workers,
+                                                       processes, ordered):
+        if error is None:
+            characters[name] = character
+        else:
+            errors[name] = error
+    return characters, errors
+
+
+def iter_saved_characters(save_directory="data/save_games", workers=DEFAULT_LOAD_WORKERS,
+                          processes=0, ordered=True):
+    """
+    Load every saved character in parallel, names come from the save manifest
+    
+    Yields: (name, character, error) like iter_load_characters
+    """
+    return iter_load_characters(list_saved_characters(save_directory), save_directory,
+                                workers, processes, ordered)
+
+# ============================================================================
+# JOURNALED SAVES
+# ============================================================================
+
+# Fields a journal record can change (the name picks the file so it can't)
+JOURNAL_FIELDS = ("class", "level", "health", "max_health", "strength", "magic",
+                  "experience", "gold", "inventory", "active_quests",
+                  "completed_quests", "equipped_weapon", "equipped_armor")
+
+# Compact into a full save after this many records or bytes
+DEFAULT_JOURNAL_ENTRIES = 100
+DEFAULT_JOURNAL_BYTES = 8192
+
+# id(character) -> CharacterJournal for every character with a journal attached
+_journals = {}
+
+
+# Journals sit in a subdirectory so appending to them doesn't change the
+# save directory's mtime (which the save manifest watches)
+JOURNAL_DIR = "journals"
+
+
+def journal_path(character_name, save_directory="data/save_games"):
+    """Path of a character's journal file"""
+    return os.path.join(save_directory, JOURNAL_DIR, f"{character_name}_save.journal")
+
+
+def remove_journal(character_name, save_directory="data/save_games"):
+    """Delete a character's journal file if it has one"""
+    try:
+        os.remove(journal_path(character_name, save_directory))
+    except FileNotFoundError:
+        pass
+
+
+def replay_journal(character, save_directory="data/save_games"):
+    """
+    Apply a character's journal on top of its loaded save file
+    
+    A last record without its newline was cut off mid-write and is skipped.
+    
+    Raises: SaveFileCorruptedError if the journal can't be read
+            InvalidSaveDataError if a record is malformed
+    """
+    name = character['name']
+    try:
+        with open(journal_path(name, save_directory), "r") as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return
+    except (OSError, UnicodeDecodeError):
+        raise SaveFileCorruptedError(f"Journal for character '{name}' is corrupted.")
+    for line in lines[:-1]:
+        if not line:
+            continue
+        try:
+            changes = json.loads(line)
+        except ValueError:
+            raise InvalidSaveDataError(f"Invalid journal record for '{name}'.")
+        if not isinstance(changes, dict) or not set(changes) <= set(JOURNAL_FIELDS):
+            raise InvalidSaveDataError(f"Invalid journal record for '{name}'.")
+        character.update(changes)
+
+
+class CharacterJournal:
+    """
+    Append-only log of a character's changes between full saves
+    
+    Each record is one JSON line with just the fields that changed,
+    e.g. {"gold":150}. Once the log reaches max_entries records or
+    max_bytes it is compacted: the full save file is rewritten and the
+    log is emptied. load_character reads the save file and then replays
+    the log.
+    
+    save_character and the save service also take full saves: they drop
+    the records their snapshot already covers and rebase() the journal,
+    so older records never replay over a newer save.
+    """
+
+    def __init__(self, character, save_directory="data/save_games",
+                 max_entries=DEFAULT_JOURNAL_ENTRIES, max_bytes=DEFAULT_JOURNAL_BYTES,
+                 sync=False, save_format=DEFAULT_SAVE_FORMAT):
+        """
+        Args:
+            character: Character dictionary to follow
+            save_directory: Directory with the save and journal files
+            max_entries / max_bytes: Compaction thresholds
+            sync: fsync every record (slower, survives power loss)
+            save_format: Format compaction writes the save file in
+        """
+        self.character = character
+        self.save_directory = save_directory
+        self.path = journal_path(character['name'], save_directory)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sync = sync
+        self.save_format = save_format
+        self.entries = 0
+        self.bytes = 0
+        self.compactions = 0
+        # Bytes rebase() has cut off the front of the journal since the last
+        # compaction, marks count from there so they outlive a rebase
+        self._base = 0
+        self._last = {}
+        self.compact()
+
+    def _fields(self):
+        """Copy of the character's journaled fields"""
+        return {field: list(value) if isinstance(value, list) else value
+                for field, value in ((field, self.character.get(field))
+                                     for field in JOURNAL_FIELDS)}
+
+    def _remember(self):
+        """Keep a copy of the fields as they are on disk now"""
+        self._last = self._fields()
+
+    def mark(self):
+        """
+        Remember where the journal is, for a full save written later (the save service)
+        
+        Returns: Mark to pass to is_current() and rebase()
+        """
+        with save_locks.character_lock(self.character['name'], self.save_directory):
+            return (self.compactions, self._base + self.bytes, self._fields())
+
+    def is_current(self, mark):
+        """
+        False if the save on disk is already newer than mark: the journal
+        was compacted or rebased past it since
+        """
+        return mark[0] == self.compactions and mark[1] >= self._base
+
+    def rebase(self, mark):
+        """
+        A full save of the state at mark was just written
+        
+        Records from before the mark are in that save, so they are dropped,
+        records appended since stay and replay on top of it. Call with the
+        character's exclusive lock held.
+        """
+        _compactions, position, fields = mark
+        try:
+            with open(self.path, "r") as f:
+                tail = f.read()[position - self._base:]
+        except FileNotFoundError:
+            tail = ""
+        if tail:
+            write_save_file(self.path, tail)
+        else:
+            remove_journal(self.character['name'], self.save_directory)
+
+        self._last = fields
+        self.entries = 0
+        for line in tail.split("\n")[:-1]:
+            if line:
+                for field, value in json.loads(line).items():
+                    self._last[field] = list(value) if isinstance(value, list) else value
+                self.entries += 1
+        self._base = position
+        self.bytes = len(tail)
+
+    def record(self):
+        """
+        Append the fields that changed since the last record
+        
+        Returns: True if a record was written
+        Raises: OSError if the journal can't be written
+        """
+        #Under the lock, since a save service write can rebase() meanwhile
+        with save_locks.character_lock(self.character['name'], self.save_directory,
+                                       exclusive=True):
+            changes = {field: self.character.get(field) for field in JOURNAL_FIELDS
+                       if self.character.get(field) != self._last[field]}
+            if not changes:
+                return False
+
+            line = json.dumps(changes, separators=(",", ":")) + "\n"
+            with open(self.path, "a") as f:
+                f.write(line)
+                if self.sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            for field, value in changes.items():
+                self._last[field] = list(value) if isinstance(value, list) else value
+            self.entries += 1
+            self.bytes += len(line)
+
+            if self.entries >= self.max_entries or self.bytes >= self.max_bytes:
+                self.compact()
+        return True
+
+    def compact(self):
+        """
+        Rewrite the full save file and empty the journal
+        
+        Raises: OSError if the save file can't be written
+        """
+        with save_locks.character_lock(self.character['name'], self.save_directory,
+                                       exclusive=True):
+            _write_character_save(self.character, self.save_directory,
+                                  encode_character_save(self.character, self.save_format))
+            remove_journal(self.character['name'], self.save_directory)
+        self.entries = 0
+        self.bytes = 0
+        self._base = 0
+        self.compactions += 1
+        self._remember()
+
+
+def attach_journal(character, save_directory="data/save_games", **options):
+    """
+    Start journaling a character's changes
+    
+    Takes a full save first, after that the journaled functions
+    (gain_experience, add_gold, heal_character, the inventory_system and
+    quest_handler functions) append their changes to the journal.
+    
+    Args:
+        options: max_entries, max_bytes, sync, save_format (see CharacterJournal)
+    
+    Returns: The CharacterJournal
+    """
+    journal = CharacterJournal(character, save_directory, **options)
+    _journals[id(character)] = journal
+    return journal
+
+
+def attached_journal(character, save_directory="data/save_games"):
+    """The journal attached to a character for save_directory, or None"""
+    journal = _journals.get(id(character))
+    if (journal is None or journal.character is not character
+            or os.path.abspath(journal.save_directory) != os.path.abspath(save_directory)):
+        return None
+    return journal
+
+
+def detach_journal(character):
+    """
+    Stop journaling a character (what's already logged stays on disk)
+    
+    Returns: The CharacterJournal that was attached, or None
+    """
+    return _journals.pop(id(character), None)
+
+
+# Journaled calls running in this thread: id(character) -> depth
+_journal_depth = threading.local()
+
+
+def journaled(func):
+    """
+    Decorator for functions that change a character (first argument)
+    
+    If the character has a journal attached, its changes are recorded
+    after the call. A journaled call inside another one (equip_weapon
+    calling add_item_to_inventory) leaves recording to the outermost
+    call, so one action is one record. A call that raises records
+    nothing, whatever it changed is picked up by the next record.
+    """
+    @functools.wraps(func)
+    def wrapper(character, *args, **kwargs):
+        journal = _journals.get(id(character))
+        if journal is None or journal.character is not character:
+            return func(character, *args, **kwargs)
+
+        depths = getattr(_journal_depth, "depths", None)
+        if depths is None:
+            depths = _journal_depth.depths = {}
+        key = id(character)
+        depth = depths.get(key, 0)
+        depths[key] = depth + 1
+        try:
+            result = func(character, *args, **kwargs)
+        finally:
+            if depth:
+                depths[key] = depth
+            else:
+                del depths[key]
+        if not depth:
+            journal.record()
+        return result
+    return wrapper
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+# Fields a loaded character has (what the cache keeps)
+SAVE_FIELDS = ("name",) + JOURNAL_FIELDS
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_CACHE_BYTES = 16 * 1024 * 1024
+
+
+def _copy_character(character):
+    """Copy of the saved fields, lists copied too so nothing is shared"""
+    return {field: list(value) if isinstance(value, list) else value
+            for field, value in ((field, character[field]) for field in SAVE_FIELDS)}
+
+
+def _character_size(character):
+    """Rough number of bytes a cached character takes"""
+    size = sys.getsizeof(character)
+    for value in character.values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+def _file_stamp(filepath):
+    """(mtime_ns, size) of a file, or None if it doesn't exist"""
+    try:
+        info = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size)
+
+
+class CharacterCache:
+    """
+    Bounded LRU cache of loaded characters
+    
+    Entries are checked with os.stat of the save file (and journal) on
+    every lookup, so a save changed by anything else is reloaded.
+    Lookups return a fresh copy, so callers can change what they get
+    without touching the cached character.
+    """
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, max_bytes=DEFAULT_CACHE_BYTES):
+        """
+        Args:
+            max_entries: Most characters kept
+            max_bytes: Rough memory limit for the cached characters
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # (directory, name) -> (stamp, character, size), least recently used first
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _stamp(self, character_name, save_directory):
+        filepath = os.path.join(save_directory, f"{character_name}_save.txt")
+        return (_file_stamp(filepath), _file_stamp(journal_path(character_name, save_directory)))
+
+    def _key(self, character_name, save_directory):
+        return (os.path.abspath(save_directory), character_name)
+
+    def _drop(self, key):
+        _stamp, _character, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _store(self, key, stamp, character):
+        size = _character_size(character)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if stamp[0] is None or size > self.max_bytes:
+                return
+            self._entries[key] = (stamp, character, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, character_name, save_directory="data/save_games"):
+        """
+        Cached copy of a character if its files haven't changed
+        
+        Returns: Character dictionary, or None on a miss
+        """
+        key = self._key(character_name, save_directory)
+        stamp = self._stamp(character_name, save_directory)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            character = entry[1]
+        return _copy_character(character)
+
+    def load(self, character_name, save_directory="data/save_games"):
+        """
+        load_character through the cache
+        
+        Raises: Same as load_character
+        """
+        character = self.get(character_name, save_directory)
+        if character is not None:
+            return character
+        #Stamp taken under the same lock as the read, so it matches what was read
+        with save_locks.character_lock(character_name, save_directory):
+            stamp = self._stamp(character_name, save_directory)
+            character = load_character(character_name, save_directory)
+        self._store(self._key(character_name, save_directory), stamp, _copy_character(character))
+        return character
+
+    def put(self, character, save_directory="data/save_games"):
+        """Cache a character that was just saved (write-through)"""
+        name = character['name']
+        self._store(self._key(name, save_directory), self._stamp(name, save_directory),
+                    _copy_character(character))
+
+    def invalidate(self, character_name, save_directory="data/save_games"):
+        """Forget a character (after it was deleted)"""
+        with self._lock:
+            key = self._key(character_name, save_directory)
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self):
+        """Forget every character"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Returns: Dictionary with hits, misses, evictions, entries and bytes
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes}
+
+
+# Cache used by load_character(use_cache=True), save_character and delete_character
+character_cache = CharacterCache()
+
+# ============================================================================
+# CHARACTER OBJECTS
+# ============================================================================
+
+class Character(MutableMapping):
+    """
+    Character with one slot per saved field instead of a per-character dict
+    
+    Works anywhere a character dictionary does (character['gold'] += 5,
+    character.get('inventory'), 'game_data' in character, .items()) and
+    compares equal to a dict with the same contents. Fields are also
+    attributes (character.level); 'class' is only reachable as
+    character['class'] since it is a keyword. Keys outside FIELDS, like
+    the game_data that inventory_system adds, go in a small extra dict.
+    """
+
+    FIELDS = SAVE_FIELDS
+    __slots__ = SAVE_FIELDS + ("_extra",)
+    _FIELD_SET = frozenset(SAVE_FIELDS)
+
+    def __init__(self, data=()):
+        """
+        Args:
+            data: Character dictionary (or mapping / key, value pairs)
+        """
+        self._extra = None
+        for key, value in (data.items() if isinstance(data, Mapping) else data):
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Character from a character dictionary"""
+        return cls(data)
+
+    def to_dict(self):
+        """Return a plain dict copy (what save_character and friends expect)"""
+        return dict(self.items())
+
+    def __getitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self._FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self._FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if hasattr(self, field):
+                yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return (sum(1 for field in self.FIELDS if hasattr(self, field))
+                + (len(self._extra) if self._extra else 0))
+
+    def __reduce__(self):
+        return (type(self).from_dict, (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+# ============================================================================
+# EXPERIENCE CURVE
+# ============================================================================
+
+# Going from level L to L + 1 costs L * XP_PER_LEVEL experience, so reaching
+# level N from level 1 takes XP_PER_LEVEL * N * (N - 1) / 2 in total
+XP_PER_LEVEL = 100
+HEALTH_PER_LEVEL = 10
+STRENGTH_PER_LEVEL = 2
+MAGIC_PER_LEVEL = 2
+
+# XP_TABLE[level] = total experience needed to reach level from level 1
+XP_TABLE_LEVELS = 1000
+XP_TABLE = [XP_PER_LEVEL * level * (level - 1) // 2 for level in range(XP_TABLE_LEVELS + 1)]
+
+
+def total_xp_for_level(level):
+    """
+    Total experience it takes to go from level 1 (with 0 XP) to level
+    
+    Example: total_xp_for_level(3) = 100 + 200 = 300
+    """
+    if 0 <= level <= XP_TABLE_LEVELS:
+        return XP_TABLE[level]
+    return XP_PER_LEVEL * level * (level - 1) // 2
+
+
+def level_for_total_xp(total_xp):
+    """
+    Level a character reaches from level 1 with total_xp experience
+    
+    Returns: Level (1 for anything under 100 XP)
+    """
+    if total_xp < XP_TABLE[-1]:
+        return max(bisect.bisect_right(XP_TABLE, total_xp) - 1, 1)
+    #Past the table: biggest N with 50 * N * (N - 1) <= total_xp
+    limit = total_xp * 2 // XP_PER_LEVEL
+    level = (1 + math.isqrt(4 * limit + 1)) // 2
+    while total_xp_for_level(level + 1) <= total_xp:
+        level += 1
+    while total_xp_for_level(level) > total_xp:
+        level -= 1
+    return level
+
+
+def xp_until_level(character, level):
+    """
+    Experience a character still needs to reach level
+    
+    Returns: XP needed (0 if it is already there)
+    """
+    needed = (total_xp_for_level(level) - total_xp_for_level(character['level'])
+              - character['experience'])
+    return max(needed, 0)
+
+
+def _apply_level_ups(character, xp_amount):
+    """
+    Closed form of the gain_experience loop for whole number XP
+    
+    Adds xp_amount, works out the final level straight from the XP
+    curve and applies every level's stat gains at once. Gives exactly
+    what the one-level-at-a-time loop gives.
+    """
+    level = character['level']
+    experience = character['experience'] + xp_amount
+    #XP on the curve measured from level 1, so leveling up is finding the
+    #highest level whose total fits
+    total = total_xp_for_level(level) + experience
+
+    #The loop takes its first step only if the next level fits, and then
+    #keeps going while the following ones fit too
+    if total_xp_for_level(level + 1) > total:
+        character['experience'] = experience
+        return
+    final_level = level_for_total_xp(total)
+    gained = final_level - level
+
+    character['experience'] = total - total_xp_for_level(final_level)
+    character['level'] = final_level
+    character['max_health'] += HEALTH_PER_LEVEL * gained
+    character['strength'] += STRENGTH_PER_LEVEL * gained
+    character['magic'] += MAGIC_PER_LEVEL * gained
+    character['health'] = character['max_health']
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
 
+@journaled
 def gain_experience(character, xp_amount):
     """
     Add experience to character and handle level ups
@@ -347,6 +1351,11 @@ def gain_experience(character, xp_amount):
     """
     if character['health'] <= 0:
         raise CharacterDeadError(f"Character '{character['name']}' is dead the opps got em!")
+    #Whole numbers (always, unless someone hands out fractional XP) level up in one step
+    if all(type(value) is int for value in (xp_amount, character['level'],
+                                            character['experience'])):
+        _apply_level_ups(character, xp_amount)
+        return
     #Sets the amount of xp needed to level up
     level_up_xp = character['level'] * 100
     character['experience'] += xp_amount
@@ -367,6 +1376,7 @@ def gain_experience(character, xp_amount):
     # Update stats on level up
     
 
+@journaled
 def add_gold(character, amount):
     """
     Add gold to character's inventory
@@ -390,6 +1400,7 @@ def add_gold(character, amount):
     # Update character's gold
     
 
+@journaled
 def heal_character(character, amount):
     """
     Heal character by specified amount
@@ -432,6 +1443,7 @@ def is_character_dead(character):
     # TODO: Implement death check
     
 
+@journaled
 def revive_character(character):
     """
     Revive a dead character with 50% health
@@ -0,0 +1,51 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Converter
+
+Rewrites character save files between the text and binary formats.
+load_character reads both, so saves can be converted at any time.
+
+Run: python convert_saves.py {text,binary} [names ...] [--dir data/save_games]
+     (no names converts every saved character)
+"""
+
+import sys
+import argparse
+
+import character_manager
+from custom_exceptions import GameError
+
+
+def convert_saves(save_format, names=None, save_directory="data/save_games"):
+    """
+    Convert saves to save_format
+
+    Returns: Dictionary {name: None if converted, else the error message}
+    """
+    if not names:
+        names = character_manager.list_saved_characters(save_directory)
+    results = {}
+    for name in names:
+        try:
+            character_manager.convert_save(name, save_format, save_directory)
+            results[name] = None
+        except (GameError, OSError, ValueError) as e:
+            results[name] = str(e)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert character save files")
+    parser.add_argument("save_format", choices=character_manager.SAVE_FORMATS)
+    parser.add_argument("names", nargs="*", help="characters to convert (default: all)")
+    parser.add_argument("--dir", default="data/save_games", help="save directory")
+    args = parser.parse_args(argv)
+
+    results = convert_saves(args.save_format, args.names, args.dir)
+    for name, error in results.items():
+        print(f"{name}: {'converted' if error is None else 'FAILED - ' + error}")
+    return 1 if any(error is not None for error in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
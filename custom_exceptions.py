@@ -123,3 +123,6 @@ class InvalidSaveDataError(GameError):
     """Raised when save file contains invalid data"""
     pass
 
+class SaveLockTimeoutError(GameError, TimeoutError):
+    """Raised when a character's save file stays locked past the lock timeout"""
+    pass
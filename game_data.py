@@ -10,17 +10,39 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import sys
+import glob
+import mmap
+import time
+import threading
+import pickle
+import re
+import locale
+import hashlib
+from collections.abc import Mapping
 from custom_exceptions import (
+    DataError,
     InvalidDataFormatError,
     MissingDataFileError,
     CorruptedDataError
 )
 
+# Compiled caches live next to the source file, e.g. data/quests.txt.cache
+CACHE_SUFFIX = ".cache"
+# Bump this whenever the cached dictionary layout or validation changes
+CACHE_VERSION = 3
+# LazyCatalog keeps its ID -> byte offset index in filename + INDEX_SUFFIX
+INDEX_SUFFIX = ".index"
+
+# Values with only a handful of different spellings, interned on load
+POOLED_QUEST_FIELDS = {"prerequisite"}
+POOLED_ITEM_FIELDS = {"type", "effect"}
+
 # ============================================================================
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", use_cache=False, as_records=False):
     """
     Load quest data from file
     
@@ -33,43 +55,29 @@ def load_quests(filename="data/quests.txt"):
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
     
+    If use_cache is True, a compiled copy of the validated quests is read
+    from (and written to) filename + CACHE_SUFFIX. The cache is rebuilt
+    automatically whenever the text file changes.
+    
+    If as_records is True, each quest is a compact QuestRecord instead
+    of a dict (same ['key'] and .get() access).
+    
     Returns: Dictionary of quests {quest_id: quest_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
+    if use_cache:
+        quest = _load_with_cache(filename, "quests", load_quests)
+        if as_records:
+            quest = {quest_id: QuestRecord(data) for quest_id, data in quest.items()}
+        return quest
     #Loads quest data from a file and returns a dictionary of quests
-    try:
-        with open(filename, 'r') as file:
-            lines = file.readlines()
-    except FileNotFoundError:
-        raise MissingDataFileError(f"Quest file is not found: {filename}")
-    except Exception:
-        raise CorruptedDataError(f"Quest file is unreadable: {filename}")
-    #crearting empty quest dictionary
-    quest = {}
-    current_block = []
-    #Looks through each line in the file
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "":
-            if current_block:
-                quest_dict = parse_quest_block(current_block)
-                validate_quest_data(quest_dict)
-                quest[quest_dict['quest_id']] = quest_dict
-                current_block = []
-        #If line is not blank, add to current block
-        else:
-            current_block.append(stripped)
-    #Process last block if exists
-    if current_block:
-        quest_dict = parse_quest_block(current_block)
-        validate_quest_data(quest_dict)
-        quest[quest_dict['quest_id']] = quest_dict
-
+    quest = fast_load_quests(filename)
+    if as_records:
+        quest = {quest_id: QuestRecord(data) for quest_id, data in quest.items()}
     return quest
 
 
-
-def load_items(filename="data/items.txt"):
+def load_items(filename="data/items.txt", use_cache=False, as_records=False):
     """
     Load item data from file
     
@@ -78,41 +86,68 @@ def load_items(filename="data/items.txt"):
     NAME: Item Display Name
     TYPE: weapon|armor|consumable
     EFFECT: stat_name:value (e.g., strength:5 or health:20)
+            several stats are comma separated (strength:5,magic:3)
     COST: 100
     DESCRIPTION: Item description
     
+    Each item also gets an 'effects' key with the compiled effect,
+    a tuple of (stat_name, value) pairs.
+    
+    If use_cache is True, a compiled copy of the validated items is read
+    from (and written to) filename + CACHE_SUFFIX, same as load_quests.
+    
+    If as_records is True, each item is a compact ItemRecord.
+    
     Returns: Dictionary of items {item_id: item_data_dict}
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
+    if use_cache:
+        item = _load_with_cache(filename, "items", load_items)
+        if as_records:
+            item = {item_id: ItemRecord(data) for item_id, data in item.items()}
+        return item
     #Loads item data from a file and returns a dictionary of items
-    try:
-        with open(filename, 'r') as f:
-            lines = f.readlines()
-    except FileNotFoundError:
-        raise MissingDataFileError(f"Item data file is not found: {filename}")
-    except Exception:
-        raise CorruptedDataError(f"Item file is unreadable: {filename}")
+    item = fast_load_items(filename)
+    if as_records:
+        item = {item_id: ItemRecord(data) for item_id, data in item.items()}
+    return item
+
+
+def iter_quests(filename="data/quests.txt"):
+    """
+    Stream validated quests from a file one block at a time
     
-    item = {}
-    current_block = []
-    #Looks through each line in the file
-    for line in lines:
-        stripped = line.strip()
-        if stripped == "":
-            if current_block:
-                item_dict = parse_item_block(current_block)
-                validate_item_data(item_dict)
-                item[item_dict['item_id']] = item_dict
-                current_block = []
-        else:
-            current_block.append(stripped)
-    #goes through last block if exists
-    if current_block:
-        item_dict = parse_item_block(current_block)
-        validate_item_data(item_dict)
-        item[item_dict['item_id']] = item_dict
+    Only the current block is kept in memory, so this works on files
+    of any size. load_quests is built on top of this.
+    
+    Yields: One quest dictionary per blank-line-separated block
+    Raises: MissingDataFileError, CorruptedDataError,
+            InvalidDataFormatError (with filename and line_number attributes)
+    """
+    for line_number, block in _iter_blocks(filename, "Quest"):
+        try:
+            quest_dict = parse_quest_block(block)
+            validate_quest_data(quest_dict)
+        except InvalidDataFormatError as e:
+            raise _located_error(e, filename, line_number) from e
+        yield quest_dict
 
-    return item
+
+def iter_items(filename="data/items.txt"):
+    """
+    Stream validated items from a file one block at a time
+    
+    Yields: One item dictionary per blank-line-separated block
+    Raises: MissingDataFileError, CorruptedDataError,
+            InvalidDataFormatError (with filename and line_number attributes)
+    """
+    for line_number, block in _iter_blocks(filename, "Item"):
+        try:
+            item_dict = parse_item_block(block)
+            validate_item_data(item_dict)
+        except InvalidDataFormatError as e:
+            raise _located_error(e, filename, line_number) from e
+        yield item_dict
 
 
 def validate_quest_data(quest_dict):
@@ -180,9 +215,9 @@ def validate_item_data(item_dict):
     if not isinstance(item_dict["cost"], int):
         raise InvalidDataFormatError("Item cost must be an integer")
     
-    #Effect must be in the format stat_name:value
-    if ":" not in item_dict["effect"]:
-        raise InvalidDataFormatError("Item effect must be in format stat_name:value")
+    #Effect must be in the format stat_name:value[,stat_name:value...]
+    if "effects" not in item_dict:
+        compile_item_effects(item_dict["effect"])
     return True
     # TODO: Implement validation
 
@@ -235,10 +270,882 @@ DESCRIPTION: Basic melee weapon.
     # Create default quests.txt and items.txt files
     # Handle any file permission errors appropriately
 
+# ============================================================================
+# FAST PARSER
+# ============================================================================
+
+# A value the way parse_*_block would keep it: no whitespace at either end
+_VALUE = r"(\S(?:[^\n]*\S)?)"
+# Numbers int() can convert (Python limits it to 4300 digits by default),
+# longer ones are left to the line parser so they raise the same error
+_MAX_DIGITS = getattr(sys, "get_int_max_str_digits", lambda: 0)() or 4300
+_DIGITS = r"-?[0-9]{1,%d}" % _MAX_DIGITS
+_NUMBER = r"(" + _DIGITS + r")"
+_EFFECT = r"([^\s,:]+:" + _DIGITS + r"(?:,[^\s,:]+:" + _DIGITS + r")*)"
+# The block must be followed by a blank line or the end of the file
+_BLOCK_END = r"(?=\n[^\S\n]*(?:\n|\Z)|\Z)"
+
+# Blocks written exactly like data/quests.txt and data/items.txt. They are
+# matched whole by the regex engine, anything else is parsed line by line.
+_CANONICAL_QUEST = re.compile(
+    r"^QUEST_ID: " + _VALUE + r"\nTITLE: " + _VALUE + r"\nDESCRIPTION: " + _VALUE +
+    r"\nREWARD_XP: " + _NUMBER + r"\nREWARD_GOLD: " + _NUMBER +
+    r"\nREQUIRED_LEVEL: " + _NUMBER + r"\nPREREQUISITE: " + _VALUE + _BLOCK_END,
+    re.MULTILINE
+)
+_CANONICAL_ITEM = re.compile(
+    r"^ITEM_ID: " + _VALUE + r"\nNAME: " + _VALUE + r"\nTYPE: (weapon|armor|consumable)" +
+    r"\nEFFECT: " + _EFFECT + r"\nCOST: " + _NUMBER + r"\nDESCRIPTION: " + _VALUE + _BLOCK_END,
+    re.MULTILINE
+)
+
+
+def fast_load_quests(filename="data/quests.txt"):
+    """
+    Load quests by scanning the whole file buffer in one pass
+    
+    Returns exactly what collecting iter_quests into a dict would, with
+    the same InvalidDataFormatError messages and line numbers. Blocks in
+    the standard layout are matched whole by one compiled regex, other
+    blocks go through parse_quest_block/validate_quest_data.
+    
+    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    text = _read_fast_source(filename, "Quest")
+    if text is None:
+        return {quest['quest_id']: quest for quest in iter_quests(filename)}
+
+    quests = {}
+    #Identical descriptions share one string object
+    descriptions = {}
+    intern = sys.intern
+    for match in _fast_blocks(text, _CANONICAL_QUEST, filename, "quests", quests):
+        quest_id, title, description, xp, gold, level, prerequisite = match.groups()
+        #Interning ids too lets a prerequisite share the quest's own id string
+        quest_id = intern(quest_id)
+        quests[quest_id] = {
+            "quest_id": quest_id,
+            "title": title,
+            "description": descriptions.setdefault(description, description),
+            "reward_xp": int(xp),
+            "reward_gold": int(gold),
+            "required_level": int(level),
+            "prerequisite": intern(prerequisite)
+        }
+    return quests
+
+
+def fast_load_items(filename="data/items.txt"):
+    """
+    Load items by scanning the whole file buffer in one pass
+    
+    Same guarantees as fast_load_quests, including the ': ' separator
+    items need (quests accept a bare ':').
+    
+    Returns: Dictionary of items {item_id: item_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    text = _read_fast_source(filename, "Item")
+    if text is None:
+        return {item['item_id']: item for item in iter_items(filename)}
+
+    items = {}
+    #Few distinct effect strings, compile each one once
+    compiled_effects = {}
+    descriptions = {}
+    intern = sys.intern
+    for match in _fast_blocks(text, _CANONICAL_ITEM, filename, "items", items):
+        item_id, name, item_type, effect, cost, description = match.groups()
+        effect = intern(effect)
+        effects = compiled_effects.get(effect)
+        if effects is None:
+            effects = compile_item_effects(effect)
+            compiled_effects[effect] = effects
+        items[item_id] = {
+            "item_id": item_id,
+            "name": name,
+            "type": intern(item_type),
+            "effect": effect,
+            "cost": int(cost),
+            "description": descriptions.setdefault(description, description),
+            "effects": effects
+        }
+    return items
+
+
+def _read_fast_source(filename, label):
+    """
+    Read a whole data file into one string with newlines normalized
+    
+    Returns: The text, or None if the file should go through the
+             line-by-line reader (not UTF-8 or not decodable), which
+             reports errors in the same order text mode would
+    """
+    try:
+        with open(filename, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        raise MissingDataFileError(f"{label} file is not found: {filename}")
+    except Exception:
+        raise CorruptedDataError(f"{label} file is unreadable: {filename}")
+
+    if not data.isascii():
+        if not _text_mode_is_utf8():
+            return None
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+    else:
+        text = data.decode("ascii")
+    #Same line endings text mode understands
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _text_mode_is_utf8():
+    """Whether open(filename, 'r') would decode as UTF-8"""
+    if sys.flags.utf8_mode:
+        return True
+    encoding = locale.getpreferredencoding(False)
+    return encoding.lower().replace("-", "").replace("_", "") == "utf8"
+
+
+def _fast_blocks(text, pattern, filename, kind, records):
+    """
+    Yield regex matches for standard blocks, parsing the rest in place
+    
+    Text between accepted matches is handed to _parse_region, which adds
+    its records to records in file order, so later duplicates still win.
+    """
+    position = 0
+    for match in pattern.finditer(text):
+        start = match.start()
+        if start != position:
+            gap = text[position:start]
+            if gap.strip():
+                #The line right before the match must be blank, otherwise
+                #the match is really the tail of a non-standard block
+                if gap[len(gap.rstrip()):].count("\n") < 2:
+                    continue
+                _parse_region(text, position, start, filename, kind, records)
+        yield match
+        position = match.end()
+
+    if text[position:].strip():
+        _parse_region(text, position, len(text), filename, kind, records)
+
+
+def _parse_region(text, start, end, filename, kind, records):
+    """Parse text[start:end] line by line with the regular block parsers"""
+    line_number = text.count("\n", 0, start)
+    block = []
+    block_start = 0
+    for line in text[start:end].split("\n"):
+        line_number += 1
+        stripped = line.strip()
+        if stripped:
+            if not block:
+                block_start = line_number
+            block.append(stripped)
+        elif block:
+            _add_region_block(block, block_start, filename, kind, records)
+            block = []
+    if block:
+        _add_region_block(block, block_start, filename, kind, records)
+
+
+def _add_region_block(block, line_number, filename, kind, records):
+    try:
+        if kind == "quests":
+            record = parse_quest_block(block)
+            validate_quest_data(record)
+            records[record["quest_id"]] = record
+        else:
+            record = parse_item_block(block)
+            validate_item_data(record)
+            records[record["item_id"]] = record
+    except InvalidDataFormatError as e:
+        raise _located_error(e, filename, line_number) from e
+
+def string_pool_report(catalog):
+    """
+    Measure how much string sharing saves in a loaded catalog
+    
+    Counts every field name and string value in the catalog, once as if
+    each one were its own copy and once per distinct string object.
+    
+    Returns: Dictionary with strings, unique_strings, bytes_if_copied,
+             bytes_used and bytes_saved
+    """
+    seen = set()
+    strings = 0
+    bytes_if_copied = 0
+    bytes_used = 0
+    for record in catalog.values():
+        for field, value in record.items():
+            for text in (field, value):
+                if not isinstance(text, str):
+                    continue
+                size = sys.getsizeof(text)
+                strings += 1
+                bytes_if_copied += size
+                if id(text) not in seen:
+                    seen.add(id(text))
+                    bytes_used += size
+    return {
+        "strings": strings,
+        "unique_strings": len(seen),
+        "bytes_if_copied": bytes_if_copied,
+        "bytes_used": bytes_used,
+        "bytes_saved": bytes_if_copied - bytes_used
+    }
+
+# ============================================================================
+# COMPACT RECORDS
+# ============================================================================
+
+class _CatalogRecord(Mapping):
+    """
+    Read-only record with one slot per field instead of a per-record dict
+    
+    Supports the same access as the quest/item dicts (record['cost'],
+    record.get('name'), 'name' in record, .items()) and compares equal
+    to a dict with the same contents. Fields outside FIELDS are kept in
+    a small extra dict so no data is lost.
+    """
+
+    __slots__ = ("_extra",)
+    FIELDS = ()
+
+    def __init__(self, data):
+        for field in self.FIELDS:
+            object.__setattr__(self, field, data[field])
+        extra = {key: value for key, value in data.items() if key not in self.FIELDS}
+        object.__setattr__(self, "_extra", extra or None)
+
+    def __getitem__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from self.FIELDS
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __reduce__(self):
+        #Slots + read-only setattr need an explicit pickle recipe
+        return (type(self), (self.to_dict(),))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self):
+        """Return a plain dict copy of the record"""
+        return dict(self.items())
+
+
+class QuestRecord(_CatalogRecord):
+    """Compact quest entry (see load_quests(as_records=True))"""
+
+    FIELDS = (
+        "quest_id",
+        "title",
+        "description",
+        "reward_xp",
+        "reward_gold",
+        "required_level",
+        "prerequisite"
+    )
+    __slots__ = FIELDS
+
+
+class ItemRecord(_CatalogRecord):
+    """Compact item entry (see load_items(as_records=True))"""
+
+    FIELDS = (
+        "item_id",
+        "name",
+        "type",
+        "effect",
+        "effects",
+        "cost",
+        "description"
+    )
+    __slots__ = FIELDS
+
+    def __init__(self, data):
+        if "effects" not in data:
+            data = dict(data, effects=compile_item_effects(data["effect"]))
+        super().__init__(data)
+
+# ============================================================================
+# SHARDED CATALOGS
+# ============================================================================
+
+def load_quest_shards(path="data/quests", workers=None):
+    """
+    Load quests split across several files, e.g. data/quests/*.txt
+    
+    Args:
+        path: Directory of .txt shards, a glob pattern, or a single file
+        workers: Number of processes (None = one per CPU, 1 = no pool)
+    
+    Returns: Tuple of (quest_dict, {shard_filename: seconds})
+    Raises: MissingDataFileError if no shards match,
+            InvalidDataFormatError on bad data or an ID in two shards
+    """
+    return _load_shards(path, "quests", workers)
+
+
+def load_item_shards(path="data/items", workers=None):
+    """
+    Load items split across several files, e.g. data/items/*.txt
+    
+    Same arguments and return value as load_quest_shards.
+    """
+    return _load_shards(path, "items", workers)
+
+
+def find_shards(path):
+    """
+    Resolve a directory, glob pattern or file into a sorted list of shards
+    
+    Returns: List of filenames
+    Raises: MissingDataFileError if nothing matches
+    """
+    if os.path.isdir(path):
+        shards = glob.glob(os.path.join(path, "*.txt"))
+    else:
+        shards = glob.glob(path)
+    #Sorting keeps merges and duplicate errors the same on every run
+    shards = sorted(shard for shard in shards if os.path.isfile(shard))
+    if not shards:
+        raise MissingDataFileError(f"No data shards found for: {path}")
+    return shards
+
+
+def _load_one_shard(kind, filename):
+    """Parse one shard (runs inside a worker process)"""
+    started = time.perf_counter()
+    if kind == "quests":
+        data = load_quests(filename)
+    else:
+        data = load_items(filename)
+    return data, time.perf_counter() - started
+
+
+def _load_shards(path, kind, workers):
+    """Parse shards in parallel, then merge them in shard order"""
+    shards = find_shards(path)
+
+    if workers == 1 or len(shards) == 1:
+        results = [_load_one_shard(kind, shard) for shard in shards]
+    else:
+        #Imported here so normal startup doesn't pay for it
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_load_one_shard, kind, shard) for shard in shards]
+            results = [future.result() for future in futures]
+
+    merged = {}
+    owner = {}
+    duplicates = []
+    timings = {}
+    for shard, (data, seconds) in zip(shards, results):
+        timings[shard] = seconds
+        for key, record in data.items():
+            if key in owner:
+                duplicates.append((key, owner[key], shard))
+                continue
+            owner[key] = shard
+            merged[key] = record
+
+    if duplicates:
+        duplicates.sort()
+        details = "; ".join(f"'{key}' in {first} and {second}"
+                            for key, first, second in duplicates)
+        raise InvalidDataFormatError(f"Duplicate {kind} IDs across shards: {details}")
+    return merged, timings
+
+# ============================================================================
+# COMPILED CACHE
+# ============================================================================
+
+def get_source_signature(filename):
+    """
+    Build the key a compiled cache is checked against
+    
+    Returns: Dictionary with path, mtime, size and sha256 of the file
+    Raises: MissingDataFileError if file doesn't exist
+            CorruptedDataError if file can't be read
+    """
+    try:
+        stat = os.stat(filename)
+        with open(filename, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        raise MissingDataFileError(f"Data file is not found: {filename}")
+    except OSError:
+        raise CorruptedDataError(f"Data file is unreadable: {filename}")
+
+    return {
+        "path": os.path.abspath(filename),
+        "mtime": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": hashlib.sha256(content).hexdigest()
+    }
+
+
+def read_data_cache(filename, kind, signature, suffix=CACHE_SUFFIX):
+    """
+    Read a compiled cache if it matches the source signature
+    
+    Args:
+        filename: Source text file (cache is filename + suffix)
+        kind: "quests" or "items"
+        signature: Result of get_source_signature(filename)
+        suffix: Sidecar file suffix
+    
+    Returns: Cached dictionary, or None if missing, stale or unreadable
+    """
+    try:
+        with open(filename + suffix, "rb") as f:
+            payload = pickle.load(f)
+    except Exception:
+        #A broken cache is never fatal, it just gets rebuilt
+        return None
+
+    if not isinstance(payload, dict):
+        return None
+    if payload.get("version") != CACHE_VERSION or payload.get("kind") != kind:
+        return None
+    if payload.get("signature") != signature:
+        return None
+    return payload.get("data")
+
+
+def write_data_cache(filename, kind, signature, data, suffix=CACHE_SUFFIX):
+    """
+    Write a compiled cache next to the source file
+    
+    The cache is written to a temp file and renamed so another process
+    never reads half of it.
+    
+    Returns: True if written, False if the directory isn't writable
+    """
+    cache_path = filename + suffix
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    payload = {
+        "version": CACHE_VERSION,
+        "kind": kind,
+        "signature": signature,
+        "data": data
+    }
+    try:
+        with open(temp_path, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
+    return True
+
+
+def _load_with_cache(filename, kind, loader):
+    """Load from the compiled cache, rebuilding it if the source changed"""
+    signature = get_source_signature(filename)
+    data = read_data_cache(filename, kind, signature)
+    if data is not None:
+        return data
+    #Cache is missing or stale so parse the text and store the result
+    data = loader(filename)
+    write_data_cache(filename, kind, signature, data)
+    return data
+
+
+def build_data_cache(quest_file="data/quests.txt", item_file="data/items.txt"):
+    """
+    Prebuild the compiled caches (used at deploy time)
+    
+    Returns: Dictionary with how many quests and items were compiled
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    built = {}
+    for kind, filename, loader in (("quests", quest_file, load_quests),
+                                   ("items", item_file, load_items)):
+        signature = get_source_signature(filename)
+        data = loader(filename)
+        if not write_data_cache(filename, kind, signature, data):
+            raise CorruptedDataError(f"Unable to write cache for {filename}")
+        built[kind] = len(data)
+    return built
+
+# ============================================================================
+# LAZY CATALOG
+# ============================================================================
+
+class LazyCatalog(Mapping):
+    """
+    Read-only quest or item catalog that parses blocks on first access
+    
+    The data file is memory mapped and only an index of
+    {id: (start_offset, end_offset, line_number)} is built up front.
+    The index is saved to filename + INDEX_SUFFIX and reused while the
+    file's mtime and size don't change. A block is parsed and validated
+    the first time its ID is looked up, then kept.
+    
+    Works anywhere a quest_data_dict or item_data_dict is expected.
+    The catalog is a snapshot, open a new one after editing the file.
+    """
+
+    _KINDS = {
+        "quests": ("QUEST_ID", "Quest"),
+        "items": ("ITEM_ID", "Item")
+    }
+
+    def __init__(self, filename, kind):
+        """
+        Args:
+            filename: Path to quests.txt or items.txt
+            kind: "quests" or "items"
+        
+        Raises: MissingDataFileError, CorruptedDataError,
+                InvalidDataFormatError if a block has no ID line
+        """
+        if kind not in self._KINDS:
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        self.filename = filename
+        self.kind = kind
+        self._id_key, self._label = self._KINDS[kind]
+        self._parsed = {}
+
+        try:
+            self._file = open(filename, "rb")
+        except FileNotFoundError:
+            raise MissingDataFileError(f"{self._label} file is not found: {filename}")
+        except OSError:
+            raise CorruptedDataError(f"{self._label} file is unreadable: {filename}")
+
+        stat = os.fstat(self._file.fileno())
+        #mmap can't map an empty file
+        if stat.st_size == 0:
+            self._map = b""
+        else:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        signature = {
+            "path": os.path.abspath(filename),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size
+        }
+        index = read_data_cache(filename, kind, signature, INDEX_SUFFIX)
+        if index is None:
+            index = self._build_index()
+            write_data_cache(filename, kind, signature, index, INDEX_SUFFIX)
+        self._index = index
+
+    def _build_index(self):
+        """Scan the mapped file once and record where every block starts"""
+        index = {}
+        data = self._map
+        id_prefix = self._id_key.encode()
+        position = 0
+        line_number = 0
+        block_start = None
+        block_line = 0
+        block_id = None
+        size = len(data)
+
+        while position <= size:
+            newline = data.find(b"\n", position)
+            if newline == -1:
+                newline = size
+            line = data[position:newline].strip()
+            line_number += 1
+
+            if line:
+                if block_start is None:
+                    block_start = position
+                    block_line = line_number
+                    block_id = None
+                key, sep, value = line.partition(b":")
+                if sep and key.strip().upper() == id_prefix:
+                    block_id = value.strip().decode("utf-8", "replace")
+            elif block_start is not None:
+                self._add_to_index(index, block_id, block_start, position, block_line)
+                block_start = None
+            position = newline + 1
+
+        if block_start is not None:
+            self._add_to_index(index, block_id, block_start, size, block_line)
+        return index
+
+    def _add_to_index(self, index, block_id, start, end, line_number):
+        """Record one block, every block needs an ID to be looked up"""
+        if block_id is None:
+            raise _located_error(
+                InvalidDataFormatError(f"{self._label} block missing {self._id_key}"),
+                self.filename,
+                line_number
+            )
+        index[block_id] = (start, end, line_number)
+
+    def _parse(self, key):
+        """Parse and validate the block for key"""
+        start, end, line_number = self._index[key]
+        try:
+            text = self._map[start:end].decode("utf-8")
+        except UnicodeDecodeError:
+            raise CorruptedDataError(f"{self._label} file is unreadable: {self.filename}")
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        try:
+            if self.kind == "quests":
+                record = parse_quest_block(lines)
+                validate_quest_data(record)
+            else:
+                record = parse_item_block(lines)
+                validate_item_data(record)
+        except InvalidDataFormatError as e:
+            raise _located_error(e, self.filename, line_number) from e
+        return record
+
+    def __getitem__(self, key):
+        if key in self._parsed:
+            return self._parsed[key]
+        if key not in self._index:
+            raise KeyError(key)
+        record = self._parse(key)
+        self._parsed[key] = record
+        return record
+
+    def __contains__(self, key):
+        #Membership only needs the index, nothing gets parsed
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class CatalogWatcher(Mapping):
+    """
+    Keeps a quest or item catalog in sync with its data file
+    
+    poll() checks the file's mtime and size. When they change, every
+    block is hashed and only blocks whose hash is new are parsed and
+    validated, the rest reuse the records already loaded. The finished
+    catalog is published by swapping one reference, so readers only
+    ever see the old catalog or the new one, never a mix.
+    
+    The watcher can be passed anywhere a quest_data_dict/item_data_dict
+    is expected. Code that does several lookups and needs them to agree
+    should take watcher.snapshot once and use that.
+    
+    If the edited file is invalid the current catalog is kept and the
+    error is stored in last_error.
+    """
+
+    def __init__(self, filename, kind):
+        """
+        Args:
+            filename: Path to quests.txt or items.txt
+            kind: "quests" or "items"
+        
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        if kind not in ("quests", "items"):
+            raise ValueError(f"Unknown catalog kind: {kind}")
+        self.filename = filename
+        self.kind = kind
+        self.last_error = None
+        self.reload_count = 0
+        self.last_reparsed = 0
+        self._snapshot = {}
+        self._records_by_hash = {}
+        self._file_state = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._reload()
+
+    @property
+    def snapshot(self):
+        """The current catalog dictionary (never modified after publishing)"""
+        return self._snapshot
+
+    def _stat(self):
+        label = "Quest" if self.kind == "quests" else "Item"
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            raise MissingDataFileError(f"{label} file is not found: {self.filename}")
+        except OSError:
+            raise CorruptedDataError(f"{label} file is unreadable: {self.filename}")
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self):
+        """Reparse changed blocks and publish a new catalog"""
+        file_state = self._stat()
+        label = "Quest" if self.kind == "quests" else "Item"
+        id_key = "quest_id" if self.kind == "quests" else "item_id"
+        old_records = self._records_by_hash
+        catalog = {}
+        records_by_hash = {}
+        reparsed = 0
+
+        for line_number, block in _iter_blocks(self.filename, label):
+            block_hash = hashlib.sha1("\n".join(block).encode()).digest()
+            record = old_records.get(block_hash)
+            if record is None:
+                #Only new or edited blocks get parsed again
+                try:
+                    if self.kind == "quests":
+                        record = parse_quest_block(block)
+                        validate_quest_data(record)
+                    else:
+                        record = parse_item_block(block)
+                        validate_item_data(record)
+                except InvalidDataFormatError as e:
+                    raise _located_error(e, self.filename, line_number) from e
+                reparsed += 1
+            records_by_hash[block_hash] = record
+            catalog[record[id_key]] = record
+
+        #Single reference swaps, readers holding the old snapshot keep it
+        self._records_by_hash = records_by_hash
+        self._snapshot = catalog
+        self._file_state = file_state
+        self.last_reparsed = reparsed
+        self.reload_count += 1
+
+    def poll(self):
+        """
+        Reload the catalog if the file changed since the last check
+        
+        Returns: True if a new catalog was published, False otherwise
+        """
+        try:
+            if self._stat() == self._file_state:
+                return False
+            self._reload()
+        except (DataError, OSError) as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        return True
+
+    def start(self, interval=1.0):
+        """Poll in a background daemon thread every interval seconds"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the background polling thread"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, interval):
+        while not self._stop_event.wait(interval):
+            self.poll()
+
+    def __getitem__(self, key):
+        return self._snapshot[key]
+
+    def __contains__(self, key):
+        return key in self._snapshot
+
+    def __iter__(self):
+        return iter(self._snapshot)
+
+    def __len__(self):
+        return len(self._snapshot)
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+def _iter_blocks(filename, label):
+    """
+    Read a data file lazily and yield its blank-line-separated blocks
+    
+    Yields: Tuples of (first_line_number, list_of_stripped_lines)
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    try:
+        file = open(filename, 'r')
+    except FileNotFoundError:
+        raise MissingDataFileError(f"{label} file is not found: {filename}")
+    except Exception:
+        raise CorruptedDataError(f"{label} file is unreadable: {filename}")
+
+    with file:
+        current_block = []
+        block_start = 0
+        try:
+            for line_number, line in enumerate(file, 1):
+                stripped = line.strip()
+                if stripped == "":
+                    if current_block:
+                        yield block_start, current_block
+                        current_block = []
+                else:
+                    #Remember where the block started for error messages
+                    if not current_block:
+                        block_start = line_number
+                    current_block.append(stripped)
+        except (UnicodeDecodeError, OSError):
+            raise CorruptedDataError(f"{label} file is unreadable: {filename}")
+        #Last block may not have a blank line after it
+        if current_block:
+            yield block_start, current_block
+
+
+def _located_error(error, filename, line_number):
+    """Copy a format error with the file and line it came from attached"""
+    located = InvalidDataFormatError(f"{filename}, line {line_number}: {error}")
+    located.filename = filename
+    located.line_number = line_number
+    return located
+
+
 def parse_quest_block(lines):
     """
     Parse a block of lines into a quest dictionary
@@ -258,8 +1165,11 @@ def parse_quest_block(lines):
         #Splits line into key and value parts
         key, value = line.split(":", 1)
         #Cleans up key and value
-        key = key.strip().lower()
+        #Keys and low-variety values are interned so every quest shares them
+        key = sys.intern(key.strip().lower())
         value = value.strip()
+        if key in POOLED_QUEST_FIELDS:
+            value = sys.intern(value)
 
         quest[key] = value
     #Convert numeric fields to integers
@@ -295,8 +1205,10 @@ def parse_item_block(lines):
 
         key, value = line.split(": ", 1)
 
-        key = key.strip().lower()
+        key = sys.intern(key.strip().lower())
         value = value.strip()
+        if key in POOLED_ITEM_FIELDS:
+            value = sys.intern(value)
 
         item[key] = value
 
@@ -306,15 +1218,60 @@ def parse_item_block(lines):
     except Exception:
         raise InvalidDataFormatError("Item cost must be an integer")
 
+    # Compile the effect once so inventory code never re-splits it
+    if "effect" in item:
+        item["effects"] = compile_item_effects(item["effect"])
+
     return item
 
     # TODO: Implement parsing logic
 
+# Character stats an item effect can change
+EFFECT_STATS = ("health", "max_health", "strength", "magic")
+
+
+def compile_item_effects(effect_string):
+    """
+    Compile an item effect string into (stat, delta) pairs
+    
+    Args:
+        effect_string: "stat_name:value" or several joined with commas,
+                       e.g. "strength:5,magic:3"
+    
+    Returns: Tuple of (stat_name, value) tuples
+    Example: "strength:5,magic:3" → (("strength", 5), ("magic", 3))
+    Raises: InvalidDataFormatError if any part is malformed or names a
+            stat outside EFFECT_STATS (checked up front, so applying the
+            effects can't fail halfway)
+    """
+    effects = []
+    for part in effect_string.split(","):
+        if ":" not in part:
+            raise InvalidDataFormatError("Item effect must be in format stat_name:value")
+        stat_name, value = part.split(":", 1)
+        stat_name = stat_name.strip()
+        if not stat_name:
+            raise InvalidDataFormatError("Item effect is missing a stat name")
+        if stat_name not in EFFECT_STATS:
+            raise InvalidDataFormatError(f"Item effect has an unknown stat: {stat_name}")
+        try:
+            effects.append((sys.intern(stat_name), int(value)))
+        except ValueError:
+            raise InvalidDataFormatError(f"Item effect value must be an integer: {part}")
+    return tuple(effects)
+
 # ============================================================================
 # TESTING
 # ============================================================================
 
 if __name__ == "__main__":
+    # Prebuild caches at deploy time:
+    #   python game_data.py --build-cache [quests_file] [items_file]
+    if len(sys.argv) > 1 and sys.argv[1] == "--build-cache":
+        built = build_data_cache(*sys.argv[2:4])
+        print(f"Cached {built['quests']} quests and {built['items']} items")
+        sys.exit(0)
+
     print("=== GAME DATA MODULE TEST ===")
     
     # Test creating default files
@@ -324,6 +1281,7 @@ if __name__ == "__main__":
     try:
          quests = load_quests()
          print(f"Loaded {len(quests)} quests")
+         print(f"Shared strings saved {string_pool_report(quests)['bytes_saved']} bytes")
     except MissingDataFileError:
          print("Quest file not found")
     except InvalidDataFormatError as e:
@@ -333,6 +1291,7 @@ if __name__ == "__main__":
     try:
          items = load_items()
          print(f"Loaded {len(items)} items")
+         print(f"Shared strings saved {string_pool_report(items)['bytes_saved']} bytes")
     except MissingDataFileError:
          print("Item file not found")
     except InvalidDataFormatError as e:
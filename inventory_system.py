@@ -15,6 +15,7 @@ from custom_exceptions import (
     InsufficientResourcesError,
     InvalidItemTypeError
 )
+from character_manager import journaled
 
 # Maximum inventory size
 MAX_INVENTORY_SIZE = 20
@@ -48,6 +49,7 @@ def ensure_character_keys(character):
         character["game_data"] = {"items": {}}
 
 
+@journaled
 def add_item_to_inventory(character, item_id):
     """
     Add an item to character's inventory
@@ -69,6 +71,7 @@ def add_item_to_inventory(character, item_id):
     # Add item_id to character['inventory'] list
     
 
+@journaled
 def remove_item_from_inventory(character, item_id):
     """
     Remove an item from character's inventory
@@ -127,6 +130,7 @@ def get_inventory_space_remaining(character):
     # TODO: Implement space calculation
     
 
+@journaled
 def clear_inventory(character):
     """
     Remove all items from inventory
@@ -147,6 +151,7 @@ def clear_inventory(character):
 # ITEM USAGE
 # ============================================================================
 
+@journaled
 def use_item(character, item_id, item_data):
     """
     Use a consumable item from inventory
@@ -170,13 +175,14 @@ def use_item(character, item_id, item_data):
         raise ItemNotFoundError(f"Item {item_id} not found in inventory.")
     if item_data['type'] != 'consumable':
         raise InvalidItemTypeError(f"Item {item_id} is not a consumable.")
-    stat_name, value = parse_item_effect(item_data['effect'])
-    apply_stat_effect(character, stat_name, value)
+    effects = get_item_effects(item_data)
+    for stat_name, value in effects:
+        apply_stat_effect(character, stat_name, value)
     remove_item_from_inventory(character, item_id)
     
     # Use item name if available, otherwise use item_id
     item_name = item_data.get('name', item_id)
-    return f"Used {item_name}, {stat_name} increased by {value}."
+    return f"Used {item_name}, {describe_effects(effects)}."
     
     # TODO: Implement item usage
     # Check if character has the item
@@ -186,6 +192,7 @@ def use_item(character, item_id, item_data):
     # Remove item from inventory
     
 
+@journaled
 def equip_weapon(character, item_id, item_data):
     """
     Equip a weapon
@@ -196,6 +203,7 @@ def equip_weapon(character, item_id, item_data):
         item_data: Item information dictionary
     
     Weapon effect format: "strength:5" (adds 5 to strength)
+    or several stats like "strength:5,magic:3"
     
     If character already has weapon equipped:
     - Unequip current weapon (remove bonus)
@@ -213,14 +221,17 @@ def equip_weapon(character, item_id, item_data):
     if item_data["type"] != "weapon":
         raise InvalidItemTypeError(f"Item {item_id} is not a weapon.")
     
+    # Compiled (and so checked) before anything changes
+    effects = get_item_effects(item_data)
+
     # Unequip old weapon
     if character["equipped_weapon"] is not None:
         old_weapon_id = unequip_weapon(character)
         add_item_to_inventory(character, old_weapon_id)
     
     # Apply new weapon bonus
-    stat_name, value = parse_item_effect(item_data["effect"])
-    character[stat_name] += value
+    for stat_name, value in effects:
+        character[stat_name] += value
     
     # Equip it
     character["equipped_weapon"] = item_id
@@ -228,7 +239,7 @@ def equip_weapon(character, item_id, item_data):
     
     # Use item name if available, otherwise use item_id
     item_name = item_data.get('name', item_id)
-    return f"Equipped {item_name}, {stat_name} increased by {value}."
+    return f"Equipped {item_name}, {describe_effects(effects)}."
     
     # TODO: Implement weapon equipping
     # Check item exists and is type 'weapon'
@@ -238,6 +249,7 @@ def equip_weapon(character, item_id, item_data):
     # Remove item from inventory
     
 
+@journaled
 def equip_armor(character, item_id, item_data):
     """
     Equip armor
@@ -248,6 +260,7 @@ def equip_armor(character, item_id, item_data):
         item_data: Item information dictionary
     
     Armor effect format: "max_health:10" (adds 10 to max_health)
+    or several stats like "max_health:10,magic:2"
     
     If character already has armor equipped:
     - Unequip current armor (remove bonus)
@@ -265,14 +278,17 @@ def equip_armor(character, item_id, item_data):
     if item_data["type"] != "armor":
         raise InvalidItemTypeError(f"Item {item_id} is not armor.")
     
+    # Compiled (and so checked) before anything changes
+    effects = get_item_effects(item_data)
+
     # Unequip old armor
     if character["equipped_armor"] is not None:
         old_armor_id = unequip_armor(character)
         add_item_to_inventory(character, old_armor_id)
     
     # Apply new armor bonus
-    stat_name, value = parse_item_effect(item_data["effect"])
-    character[stat_name] += value
+    for stat_name, value in effects:
+        character[stat_name] += value
     
     # Equip it
     character["equipped_armor"] = item_id
@@ -280,11 +296,12 @@ def equip_armor(character, item_id, item_data):
     
     # Use item name if available, otherwise use item_id
     item_name = item_data.get('name', item_id)
-    return f"Equipped {item_name}, {stat_name} increased by {value}."
+    return f"Equipped {item_name}, {describe_effects(effects)}."
     # TODO: Implement armor equipping
     # Similar to equip_weapon but for armor
     
 
+@journaled
 def unequip_weapon(character):
     """
     Remove equipped weapon and return it to inventory
@@ -302,8 +319,8 @@ def unequip_weapon(character):
 
     # Remove stat bonus
     weapon_data = character["game_data"]["items"][weapon_id]
-    stat, val = parse_item_effect(weapon_data["effect"])
-    character[stat] -= val
+    for stat, val in get_item_effects(weapon_data):
+        character[stat] -= val
 
     # Unequip it
     character["equipped_weapon"] = None
@@ -316,6 +333,7 @@ def unequip_weapon(character):
     # Clear equipped_weapon from character
     
 
+@journaled
 def unequip_armor(character):
     """
     Remove equipped armor and return it to inventory
@@ -332,8 +350,8 @@ def unequip_armor(character):
 
     # Remove stat bonus
     armor_data = character["game_data"]["items"][armor_id]
-    stat, val = parse_item_effect(armor_data["effect"])
-    character[stat] -= val
+    for stat, val in get_item_effects(armor_data):
+        character[stat] -= val
 
     character["equipped_armor"] = None
     return armor_id
@@ -344,6 +362,7 @@ def unequip_armor(character):
 # SHOP SYSTEM
 # ============================================================================
 
+@journaled
 def purchase_item(character, item_id, item_data):
     """
     Purchase an item from a shop
@@ -374,6 +393,7 @@ def purchase_item(character, item_id, item_data):
     # Add item to inventory
     
 
+@journaled
 def sell_item(character, item_id, item_data):
     """
     Sell an item for half its purchase cost
@@ -401,6 +421,32 @@ def sell_item(character, item_id, item_data):
     # Add gold to character
     
 
+def get_shop_items(item_data_dict, item_type=None, max_cost=None):
+    """
+    List the items a shop should show
+    
+    Args:
+        item_data_dict: Dictionary of all item data
+        item_type: Only this type (weapon, armor, consumable) if given
+        max_cost: Only items costing at most this much if given
+    
+    Catalogs that can filter themselves (catalog_store.ItemStore) get
+    the filters pushed down to their query_items method.
+    
+    Returns: List of item dictionaries
+    """
+    if hasattr(item_data_dict, 'query_items'):
+        return item_data_dict.query_items(item_type=item_type, max_cost=max_cost)
+    shop_items = []
+    for item in item_data_dict.values():
+        if item_type is not None and item['type'] != item_type:
+            continue
+        if max_cost is not None and item['cost'] > max_cost:
+            continue
+        shop_items.append(item)
+    return shop_items
+    
+
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
@@ -412,6 +458,8 @@ def parse_item_effect(effect_string):
     Args:
         effect_string: String in format "stat_name:value"
     
+    For multi-stat effects ("strength:5,magic:3") use get_item_effects.
+    
     Returns: Tuple of (stat_name, value)
     Example: "health:20" → ("health", 20)
     """
@@ -423,6 +471,37 @@ def parse_item_effect(effect_string):
     # Convert value to integer
     
 
+def get_item_effects(item_data):
+    """
+    Get an item's effect as (stat_name, value) pairs
+    
+    Items from game_data already carry the compiled 'effects' tuple, so
+    this is just a lookup. Hand-built item dicts with only an 'effect'
+    string are compiled on the spot.
+    
+    Returns: Tuple of (stat_name, value) tuples
+    Example: {"effect": "strength:5,magic:3"} → (("strength", 5), ("magic", 3))
+    """
+    effects = item_data.get('effects')
+    if effects is None:
+        #Imported here so importing inventory_system doesn't pull in
+        #game_data's regexes, mmap and hashlib (see main.py --lazy-start)
+        from game_data import compile_item_effects
+
+        effects = compile_item_effects(item_data['effect'])
+    return effects
+
+
+def describe_effects(effects):
+    """
+    Describe compiled effects for messages
+    
+    Example: (("strength", 5), ("magic", 3)) →
+             "strength increased by 5 and magic increased by 3"
+    """
+    return " and ".join(f"{stat_name} increased by {value}" for stat_name, value in effects)
+
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
@@ -0,0 +1,164 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Item Table Module
+
+This module stores the item catalog as parallel NumPy arrays so shop
+listings and affordability checks can run over every item at once.
+
+NumPy is optional for the rest of the game, it is only needed here.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from inventory_system import get_item_effects
+
+# Item types and effect stats are stored as small integer codes
+TYPE_CODES = {"weapon": 0, "armor": 1, "consumable": 2}
+STAT_CODES = {"health": 0, "max_health": 1, "strength": 2, "magic": 3}
+UNKNOWN_STAT = -1
+
+# Columns that query() and top_k() can sort on (stat names work too)
+SORT_KEYS = ("cost", "effect_value")
+
+# ============================================================================
+# ITEM TABLE
+# ============================================================================
+
+class ItemTable:
+    """
+    Columnar copy of an item catalog
+
+    Columns (all the same length, in catalog order):
+        ids: item IDs
+        type_codes: TYPE_CODES value for each item
+        cost: item cost in gold
+        effect_stat: STAT_CODES value of the first effect stat (UNKNOWN_STAT if other)
+        effect_value: amount the first effect changes its stat by
+        stat_bonus: (items, len(STAT_CODES)) total change to each stat,
+                    covers multi-stat items like "strength:5,magic:3"
+    """
+
+    def __init__(self, item_data_dict):
+        """
+        Build the table from load_items() output (or any item mapping)
+
+        Raises: ImportError if NumPy isn't installed
+        """
+        if np is None:
+            raise ImportError("ItemTable requires NumPy (pip install numpy)")
+
+        ids = []
+        type_codes = []
+        costs = []
+        stats = []
+        values = []
+        bonuses = []
+        for item_id, item in item_data_dict.items():
+            effects = get_item_effects(item)
+            stat_name, value = effects[0]
+            bonus = [0] * len(STAT_CODES)
+            for name, delta in effects:
+                if name in STAT_CODES:
+                    bonus[STAT_CODES[name]] += delta
+            ids.append(item_id)
+            type_codes.append(TYPE_CODES[item["type"]])
+            costs.append(item["cost"])
+            stats.append(STAT_CODES.get(stat_name, UNKNOWN_STAT))
+            values.append(value)
+            bonuses.append(bonus)
+
+        self.ids = np.array(ids, dtype=object)
+        self.type_codes = np.array(type_codes, dtype=np.int8)
+        self.cost = np.array(costs, dtype=np.int64)
+        self.effect_stat = np.array(stats, dtype=np.int8)
+        self.effect_value = np.array(values, dtype=np.int64)
+        self.stat_bonus = np.array(bonuses, dtype=np.int64).reshape(len(ids), len(STAT_CODES))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mask(self, item_type=None, stat=None, min_cost=None, max_cost=None):
+        """
+        Build a boolean mask of items matching every given filter
+
+        Args:
+            item_type: "weapon", "armor" or "consumable"
+            stat: Effect stat name, e.g. "strength" (any of the item's stats)
+            min_cost / max_cost: Inclusive cost bounds
+
+        Returns: Boolean array with one entry per item
+        """
+        selected = np.ones(len(self.ids), dtype=bool)
+        if item_type is not None:
+            selected &= self.type_codes == TYPE_CODES[item_type]
+        if stat is not None:
+            if stat not in STAT_CODES:
+                return np.zeros(len(self.ids), dtype=bool)
+            selected &= self.stat_bonus[:, STAT_CODES[stat]] != 0
+        if min_cost is not None:
+            selected &= self.cost >= min_cost
+        if max_cost is not None:
+            selected &= self.cost <= max_cost
+        return selected
+
+    def query(self, item_type=None, stat=None, min_cost=None, max_cost=None,
+              sort_by=None, descending=False, limit=None):
+        """
+        Filter, sort and trim the catalog
+
+        Example: all weapons under 200 gold, best strength bonus first
+            table.query("weapon", stat="strength", max_cost=199,
+                        sort_by="strength", descending=True)
+
+        sort_by can be a column in SORT_KEYS or a stat in STAT_CODES.
+
+        Ties keep catalog order.
+
+        Returns: List of item IDs
+        """
+        indices = np.flatnonzero(self.mask(item_type, stat, min_cost, max_cost))
+        if sort_by is not None:
+            if sort_by in SORT_KEYS:
+                keys = getattr(self, sort_by)[indices]
+            elif sort_by in STAT_CODES:
+                keys = self.stat_bonus[indices, STAT_CODES[sort_by]]
+            else:
+                raise ValueError(f"Cannot sort items by: {sort_by}")
+            if descending:
+                keys = -keys
+            indices = indices[np.argsort(keys, kind="stable")]
+        if limit is not None:
+            indices = indices[:limit]
+        return self.ids[indices].tolist()
+
+    def top_k(self, k, sort_by="effect_value", **filters):
+        """
+        Get the k best items by a column (highest first)
+
+        Returns: List of up to k item IDs
+        """
+        return self.query(sort_by=sort_by, descending=True, limit=k, **filters)
+
+    def affordable(self, gold):
+        """
+        Check which items each character can afford in one call
+
+        Args:
+            gold: Sequence of gold amounts, one per character
+
+        Returns: Boolean array shaped (characters, items)
+        """
+        gold = np.asarray(gold, dtype=np.int64)
+        return gold[:, None] >= self.cost[None, :]
+
+    def affordable_items(self, gold, **filters):
+        """
+        List the items each character can afford, optionally filtered
+
+        Returns: List (one per character) of lists of item IDs
+        """
+        matrix = self.affordable(gold) & self.mask(**filters)[None, :]
+        return [self.ids[row].tolist() for row in matrix]
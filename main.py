@@ -10,14 +10,62 @@ This is the main game file that ties all modules together.
 Demonstrates module integration and complete game flow.
 """
 
-# Import all our custom modules
-import character_manager
-import inventory_system
-import quest_handler
-import combat_system
-import game_data
+import time
+
+# Used by --profile-startup to measure from the very start of the program
+_STARTUP_BEGIN = time.perf_counter()
+
+import argparse
+import importlib
 from custom_exceptions import *
 
+# ============================================================================
+# LAZY MODULE LOADING
+# ============================================================================
+
+# Startup step -> seconds, printed by --profile-startup
+startup_timings = {}
+
+
+def record_startup_time(step, seconds):
+    """Remember how long a startup step took"""
+    startup_timings[step] = startup_timings.get(step, 0.0) + seconds
+
+
+class LazyModule:
+    """
+    Stand-in for one of our game modules that imports it on first use
+    
+    Lets main.py write character_manager.create_character(...) as usual
+    while the real import only happens when a menu path needs it.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import the real module (once) and return it"""
+        if self._module is None:
+            started = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            record_startup_time(f"import {self._name}", time.perf_counter() - started)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+
+# Import all our custom modules (lazily, see LazyModule)
+character_manager = LazyModule("character_manager")
+inventory_system = LazyModule("inventory_system")
+quest_handler = LazyModule("quest_handler")
+combat_system = LazyModule("combat_system")
+game_data = LazyModule("game_data")
+save_service = LazyModule("save_service")
+GAME_MODULES = [character_manager, inventory_system, quest_handler, combat_system, game_data,
+                save_service]
+
 # ============================================================================
 # GAME STATE
 # ============================================================================
@@ -26,6 +74,7 @@ from custom_exceptions import *
 current_character = None
 all_quests = {}
 all_items = {}
+game_data_loaded = False
 game_running = False
 
 # ============================================================================
@@ -110,7 +159,7 @@ def load_game():
     #Calls load function to get an alr saved player and continues game loop
     try:
         character_name = input()
-        current_character = character_manager.load_character(character_name)
+        current_character = character_manager.load_character(character_name, use_cache=True)
         game_loop()
     except CharacterNotFoundError and SaveFileCorruptedError as e:
         print(e)
@@ -176,6 +225,7 @@ def game_menu():
 
 def view_character_stats():
     """Display character information"""
+    ensure_game_data()
     global current_character
     global all_quests
 
@@ -190,6 +240,7 @@ def view_character_stats():
 
 def view_inventory():
     """Display and manage inventory"""
+    ensure_game_data()
     global current_character, all_items
 
     inventory_system.display_inventory(current_character, all_items)
@@ -203,6 +254,7 @@ def view_inventory():
 
 def quest_menu():
     """Quest management menu"""
+    ensure_game_data()
     global current_character, all_quests
     
     print("Quest Menu")
@@ -245,6 +297,7 @@ def explore():
 
 def shop():
     """Shop menu for buying/selling items"""
+    ensure_game_data()
     global current_character, all_items
     
     print(all_items)
@@ -261,29 +314,40 @@ def shop():
 # HELPER FUNCTIONS
 # ============================================================================
 
-def save_game():
-    """Save current game state"""
+def save_game(wait=False):
+    """Save current game state (wait=True returns once it is on disk)"""
     global current_character
     
-    character_manager.save_character()
-
-    # TODO: Implement save
-    # Use character_manager.save_character()
-    # Handle any file I/O exceptions
-    pass
+    #Write-behind save so the game doesn't wait on the disk after every action
+    if current_character is None:
+        return False
+    pending_save = save_service.autosave(current_character)
+    if wait:
+        try:
+            pending_save.result()
+        except (IOError, PermissionError) as e:
+            print(f"Error saving character: {e}")
+            return False
+    return True
 
 def load_game_data():
     """Load all quest and item data from files"""
-    global all_quests, all_items
+    global all_quests, all_items, game_data_loaded
     
+    started = time.perf_counter()
     try:
-        game_data.load_quests()
+        all_quests = game_data.load_quests(use_cache=True)
     except (MissingDataFileError, InvalidDataFormatError):
         game_data.create_default_data_files()
+    record_startup_time("load quests", time.perf_counter() - started)
+
+    started = time.perf_counter()
     try:
-        game_data.load_items()
+        all_items = game_data.load_items(use_cache=True)
     except (MissingDataFileError, InvalidDataFormatError):
         game_data.create_default_data_files()
+    record_startup_time("load items", time.perf_counter() - started)
+    game_data_loaded = True
 
     # TODO: Implement data loading
     # Try to load quests with game_data.load_quests()
@@ -292,6 +356,12 @@ def load_game_data():
     # If files missing, create defaults with game_data.create_default_data_files()
     
 
+def ensure_game_data():
+    """Load quest and item data the first time a menu needs it"""
+    if not game_data_loaded:
+        load_game_data()
+
+
 def handle_character_death():
     """Handle character death"""
     global current_character, game_running
@@ -323,24 +393,58 @@ def display_welcome():
 # MAIN EXECUTION
 # ============================================================================
 
-def main():
+def parse_args(argv=None):
+    """Read command line options"""
+    parser = argparse.ArgumentParser(description="Quest Chronicles")
+    parser.add_argument("--lazy-start", action="store_true",
+                        help="only import modules and load data when a menu needs them")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup step took")
+    parser.add_argument("--startup-budget", type=float, default=None, metavar="MS",
+                        help="with --profile-startup, warn if startup takes longer than MS")
+    return parser.parse_args(argv)
+
+
+def print_startup_profile(budget_ms=None):
+    """Print the import/initialization time breakdown"""
+    total_ms = (time.perf_counter() - _STARTUP_BEGIN) * 1000
+    print("=== STARTUP PROFILE ===")
+    for step, seconds in startup_timings.items():
+        print(f"{step:<28} {seconds * 1000:8.1f} ms")
+    print(f"{'total':<28} {total_ms:8.1f} ms")
+    if budget_ms is not None and total_ms > budget_ms:
+        print(f"WARNING: startup took {total_ms:.1f} ms, budget is {budget_ms:.1f} ms")
+
+
+def main(argv=None):
     """Main game execution function"""
+    options = parse_args(argv)
     
+    # Eager start imports everything and loads data before the menu,
+    # lazy start leaves it for the first menu that needs it
+    if not options.lazy_start:
+        for module in GAME_MODULES:
+            module.load()
+
     # Display welcome message
     display_welcome()
     
     # Load game data
-    try:
-        load_game_data()
-        print("Game data loaded successfully!")
-    except MissingDataFileError:
-        print("Creating default game data...")
-        game_data.create_default_data_files()
-        load_game_data()
-    except InvalidDataFormatError as e:
-        print(f"Error loading game data: {e}")
-        print("Please check data files for errors.")
-        return
+    if not options.lazy_start:
+        try:
+            load_game_data()
+            print("Game data loaded successfully!")
+        except MissingDataFileError:
+            print("Creating default game data...")
+            game_data.create_default_data_files()
+            load_game_data()
+        except InvalidDataFormatError as e:
+            print(f"Error loading game data: {e}")
+            print("Please check data files for errors.")
+            return
+
+    if options.profile_startup:
+        print_startup_profile(options.startup_budget)
     
     # Main menu loop
     while True:
@@ -358,4 +462,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
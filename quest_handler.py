@@ -16,11 +16,13 @@ from custom_exceptions import (
     QuestNotActiveError,
     InsufficientLevelError
 )
+from character_manager import journaled
 
 # ============================================================================
 # QUEST MANAGEMENT
 # ============================================================================
 
+@journaled
 def accept_quest(character, quest_id, quest_data_dict):
     """
     Accept a new quest
@@ -74,6 +76,7 @@ def accept_quest(character, quest_id, quest_data_dict):
     # Add to character['active_quests']
     
 
+@journaled
 def complete_quest(character, quest_id, quest_data_dict):
     """
     Complete an active quest and grant rewards
@@ -115,6 +118,7 @@ def complete_quest(character, quest_id, quest_data_dict):
     # Return reward summary
     
 
+@journaled
 def abandon_quest(character, quest_id):
     """
     Remove a quest from active quests without completing it
@@ -301,14 +305,20 @@ def get_quests_by_level(quest_data_dict, min_level, max_level):
     """
     Get all quests within a level range
     
+    Catalogs that can filter themselves (catalog_store.QuestStore) get
+    the range pushed down to their query_quests method.
+    
     Returns: List of quest dictionaries
     """
+    if hasattr(quest_data_dict, 'query_quests'):
+        return quest_data_dict.query_quests(min_level=min_level, max_level=max_level)
     #Creates a dict for filtered quests
     filtered_quests = []
     for quest in quest_data_dict.values():
         if min_level <= quest['required_level'] <= max_level:
             #Checks if able to get put into that dict then if able it gets added
             filtered_quests.append(quest)
+    return filtered_quests
 
     # TODO: Implement level filtering
     
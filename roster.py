@@ -0,0 +1,336 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Roster Module
+
+This module keeps many characters' numbers (level, experience, health,
+max_health, strength, magic, gold) in parallel NumPy arrays, so events
+that hand XP or gold to everyone run over every character at once
+instead of one gain_experience/add_gold call per dictionary.
+
+Each bulk operation gives every character the same result the scalar
+function in character_manager would. Where the scalar function raises
+(a dead character gaining XP, gold going negative), the bulk version
+leaves that character unchanged and reports it in a mask instead.
+
+NumPy is optional for the rest of the game, it is only needed here.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import character_manager
+from character_manager import (XP_PER_LEVEL, HEALTH_PER_LEVEL, STRENGTH_PER_LEVEL,
+                               MAGIC_PER_LEVEL, DEFAULT_SAVE_FORMAT, DEFAULT_LOAD_WORKERS)
+
+# Fields stored as int64 columns, everything else stays per character
+NUMERIC_FIELDS = ("level", "experience", "health", "max_health", "strength", "magic", "gold")
+
+# Largest level and total XP the int64 curve handles (100 * N * N has to fit)
+MAX_CURVE_LEVEL = 3 * 10**8
+MAX_CURVE_XP = 2**61
+# grant_xp levels rows with bigger numbers than this one at a time with
+# Python ints, so their sums can't overflow
+_BULK_LEVEL = 10**8
+_BULK_XP = 2**59
+
+# ============================================================================
+# EXPERIENCE CURVE
+# ============================================================================
+
+def _in_range(values, limit):
+    """Boolean array, True where -limit <= value <= limit"""
+    return (values >= -limit) & (values <= limit)
+
+
+def total_xp_for_levels(levels):
+    """
+    Vectorized character_manager.total_xp_for_level
+
+    Raises: OverflowError for levels beyond +-MAX_CURVE_LEVEL
+    """
+    levels = np.asarray(levels)
+    if not _in_range(levels, MAX_CURVE_LEVEL).all():
+        raise OverflowError(f"Levels beyond {MAX_CURVE_LEVEL} overflow int64")
+    return XP_PER_LEVEL * levels * (levels - 1) // 2
+
+
+def levels_for_total_xp(total_xp):
+    """
+    Vectorized character_manager.level_for_total_xp
+
+    Starts from the float solution of 50 * N * (N - 1) = total_xp and
+    fixes it up with exact integer comparisons.
+
+    Returns: int64 array of levels (1 for anything under 100 XP)
+    Raises: OverflowError for totals above MAX_CURVE_XP
+    """
+    total_xp = np.maximum(total_xp, 0)
+    if (total_xp > MAX_CURVE_XP).any():
+        raise OverflowError(f"Total XP above {MAX_CURVE_XP} overflows int64")
+    levels = np.floor((1 + np.sqrt(1 + 8 * (total_xp / XP_PER_LEVEL))) / 2).astype(np.int64)
+    levels += total_xp_for_levels(levels + 1) <= total_xp
+    levels -= total_xp_for_levels(levels) > total_xp
+    return np.maximum(levels, 1)
+
+# ============================================================================
+# ROSTER
+# ============================================================================
+
+def _as_amounts(amount, size):
+    """
+    Broadcast a whole number (or one per character) to an int64 array
+
+    Raises: TypeError for anything but whole numbers
+            OverflowError for whole numbers that don't fit in int64
+    """
+    amounts = np.asarray(amount)
+    if amounts.dtype.kind == "O" and all(isinstance(value, int) for value in amounts.flat):
+        raise OverflowError("Roster amounts must fit in int64")
+    if amounts.dtype.kind not in "iub":
+        raise TypeError("Roster amounts must be whole numbers")
+    if amounts.dtype.kind == "u" and (amounts > np.iinfo(np.int64).max).any():
+        raise OverflowError("Roster amounts must fit in int64")
+    return np.broadcast_to(amounts.astype(np.int64), (size,))
+
+
+class Roster:
+    """
+    Columnar copy of many characters
+
+    Columns (all the same length, one entry per character):
+        names: character names
+        level, experience, health, max_health, strength, magic, gold:
+            int64 arrays (NUMERIC_FIELDS)
+
+    The other fields (class, inventory, quests, equipment) are kept per
+    character and come back unchanged from to_characters().
+
+    Every bulk operation takes an optional where mask to only touch some
+    characters, e.g. roster.grant_xp(500, where=roster.level >= 10).
+    """
+
+    def __init__(self, characters):
+        """
+        Build the roster from character dictionaries (or Character objects)
+
+        Raises: ImportError if NumPy isn't installed
+                ValueError if a numeric field isn't a whole number
+        """
+        if np is None:
+            raise ImportError("Roster requires NumPy (pip install numpy)")
+
+        characters = list(characters)
+        self.names = np.array([character["name"] for character in characters], dtype=object)
+        self._other = [{key: value for key, value in character.items()
+                        if key not in NUMERIC_FIELDS}
+                       for character in characters]
+        for field in NUMERIC_FIELDS:
+            column = np.array([character[field] for character in characters])
+            if len(characters) and column.dtype.kind not in "iu":
+                raise ValueError(f"Roster field {field} must hold whole numbers")
+            setattr(self, field, column.astype(np.int64).reshape(len(characters)))
+        self._saved = self._snapshot()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _snapshot(self):
+        return np.stack([getattr(self, field) for field in NUMERIC_FIELDS])
+
+    def _where(self, where):
+        """Boolean mask of the characters an operation applies to"""
+        if where is None:
+            return np.ones(len(self), dtype=bool)
+        return np.broadcast_to(np.asarray(where, dtype=bool), (len(self),))
+
+    def index(self, name):
+        """
+        Row of a character
+
+        Raises: KeyError if the character isn't in the roster
+        """
+        rows = np.flatnonzero(self.names == name)
+        if not len(rows):
+            raise KeyError(name)
+        return int(rows[0])
+
+    # ------------------------------------------------------------------------
+    # BULK OPERATIONS
+    # ------------------------------------------------------------------------
+
+    def grant_xp(self, amount, where=None):
+        """
+        Bulk gain_experience, with every level up it causes
+
+        Args:
+            amount: XP for everyone, or one amount per character
+
+        Returns: Boolean array, True where the XP was given. Dead
+                 characters (health <= 0) are skipped, gain_experience
+                 would raise CharacterDeadError for them.
+        Raises: OverflowError if an amount or a result doesn't fit in
+                int64 (nothing is changed then)
+        """
+        amount = _as_amounts(amount, len(self))
+        applied = self._where(where) & (self.health > 0)
+        #Rows with numbers big enough to overflow the int64 sums are left
+        #out here and leveled one at a time below
+        bulk = (_in_range(self.level, _BULK_LEVEL) & _in_range(self.experience, _BULK_XP)
+                & _in_range(amount, _BULK_XP))
+        rows = applied & bulk
+
+        level = np.where(bulk, self.level, 1)
+        experience = np.where(bulk, self.experience + np.where(bulk, amount, 0), 0)
+        total = total_xp_for_levels(level) + experience
+        #Same rule as character_manager._apply_level_ups: the first level
+        #up has to fit, then the curve gives the final level directly
+        leveled = rows & (total_xp_for_levels(level + 1) <= total)
+        final_level = np.where(leveled, levels_for_total_xp(np.where(leveled, total, 0)), level)
+        gained = np.where(leveled, final_level - level, 0)
+
+        columns = {
+            "level": np.where(leveled, final_level, self.level),
+            "experience": np.where(
+                leveled, total - total_xp_for_levels(np.where(leveled, final_level, 1)),
+                np.where(rows, experience, self.experience)),
+            "max_health": self.max_health + HEALTH_PER_LEVEL * gained,
+            "strength": self.strength + STRENGTH_PER_LEVEL * gained,
+            "magic": self.magic + MAGIC_PER_LEVEL * gained,
+        }
+        columns["health"] = np.where(leveled, columns["max_health"], self.health)
+
+        for row in np.flatnonzero(applied & ~bulk).tolist():
+            character = {field: int(column[row]) for field, column in columns.items()}
+            character_manager._apply_level_ups(character, int(amount[row]))
+            for field, value in character.items():
+                columns[field][row] = value  # OverflowError past int64
+
+        for field, column in columns.items():
+            setattr(self, field, column)
+        return applied
+
+    def add_gold(self, amount, where=None):
+        """
+        Bulk add_gold (negative amounts spend gold)
+
+        Returns: Boolean array, True where the gold changed. Characters
+                 who can't afford a negative amount keep their gold,
+                 add_gold would raise ValueError for them.
+        """
+        amount = _as_amounts(amount, len(self))
+        gold = self.gold + amount
+        applied = self._where(where) & (gold >= 0)
+        self.gold = np.where(applied, gold, self.gold)
+        return applied
+
+    def insufficient_funds(self, cost):
+        """Boolean array, True for characters with less gold than cost"""
+        return self.gold < _as_amounts(cost, len(self))
+
+    def heal(self, amount, where=None):
+        """
+        Bulk heal_character, health stops at max_health
+
+        Returns: int64 array of the amount each character actually healed
+                 (0 outside where)
+        """
+        amount = _as_amounts(amount, len(self))
+        selected = self._where(where)
+        #heal_character sets overhealed characters to max_health, which can
+        #lower health if it was already above max
+        healed = np.where(self.health + amount > self.max_health, self.max_health,
+                          self.health + amount)
+        actual = np.where(selected, healed - self.health, 0)
+        self.health = np.where(selected, healed, self.health)
+        return actual
+
+    def dead(self):
+        """Boolean array, True for characters with health <= 0"""
+        return self.health <= 0
+
+    def revive(self, where=None):
+        """
+        Bulk revive_character, dead characters come back at half max_health
+
+        Returns: Boolean array, True where a character was revived
+        """
+        revived = self._where(where) & self.dead()
+        self.health = np.where(revived, self.max_health // 2, self.health)
+        return revived
+
+    # ------------------------------------------------------------------------
+    # CONVERSION AND SAVES
+    # ------------------------------------------------------------------------
+
+    def character(self, row):
+        """Character dictionary for one row"""
+        character = dict(self._other[row])
+        for field in NUMERIC_FIELDS:
+            character[field] = int(getattr(self, field)[row])
+        return character
+
+    def to_characters(self):
+        """
+        Convert back to character dictionaries
+
+        Returns: List of character dictionaries, in roster order
+        """
+        columns = [getattr(self, field).tolist() for field in NUMERIC_FIELDS]
+        characters = []
+        for row, other in enumerate(self._other):
+            character = dict(other)
+            for field, column in zip(NUMERIC_FIELDS, columns):
+                character[field] = column[row]
+            characters.append(character)
+        return characters
+
+    def changed(self):
+        """Boolean array, True for characters changed since loading or the last save"""
+        if not len(self):
+            return np.zeros(0, dtype=bool)
+        return (self._snapshot() != self._saved).any(axis=0)
+
+    def save(self, save_directory="data/save_games", save_format=DEFAULT_SAVE_FORMAT,
+             changed_only=True, workers=DEFAULT_LOAD_WORKERS):
+        """
+        Write characters back to their save files with save_character
+
+        Args:
+            changed_only: Only save characters whose numbers changed
+            workers: Threads writing saves at once
+
+        Returns: List of names whose save failed
+        """
+        rows = np.flatnonzero(self.changed()) if changed_only else np.arange(len(self))
+
+        def save_row(row):
+            return character_manager.save_character(self.character(row), save_directory,
+                                                    save_format)
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            results = list(pool.map(save_row, rows.tolist()))
+
+        failed = [self.names[row] for row, ok in zip(rows.tolist(), results) if not ok]
+        saved = np.isin(np.arange(len(self)), rows) & ~np.isin(self.names, failed)
+        self._saved[:, saved] = self._snapshot()[:, saved]
+        return failed
+
+
+def load_roster(names=None, save_directory="data/save_games", workers=DEFAULT_LOAD_WORKERS):
+    """
+    Load saved characters into a Roster with character_manager.load_characters
+
+    Args:
+        names: Characters to load (default: every saved character)
+
+    Returns: Tuple of (roster, errors), errors is {name: exception}
+             for every save that couldn't be loaded
+    """
+    if names is None:
+        names = character_manager.list_saved_characters(save_directory)
+    characters, errors = character_manager.load_characters(names, save_directory, workers)
+    return Roster(characters.values()), errors
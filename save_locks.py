@@ -0,0 +1,202 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Locks Module
+
+Advisory per-character file locks, so several game servers can share one
+save directory. Loads take a shared (reader) lock, saves, journal writes
+and deletes take an exclusive (writer) lock. Different characters never
+wait on each other.
+
+Locks are fcntl.flock locks on {save_directory}/.locks/{name}.lock (kept
+in a subdirectory so they don't change the save directory's mtime, see
+save_manifest). They are released when the holder exits, even if it
+crashes. A thread that already holds a character's lock can take it again
+(an exclusive lock covers shared requests too), so save_character inside
+a locked convert_save doesn't wait on itself.
+
+Waiting longer than the timeout raises SaveLockTimeoutError. lock_stats()
+reports how many locks were taken and how long they waited.
+
+Without fcntl (Windows) locks only exclude other threads of this process.
+In a read-only save directory, where lock files can't be created, shared
+locks are skipped.
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from custom_exceptions import SaveLockTimeoutError
+
+LOCK_DIR = ".locks"
+DEFAULT_LOCK_TIMEOUT = 10.0
+
+# Polling backoff while a lock is held by someone else
+_FIRST_POLL = 0.001
+_MAX_POLL = 0.01
+
+# Locks this thread holds: lock path -> [exclusive, depth]
+_held = threading.local()
+# Without fcntl: one lock per path for the whole process
+_fallback_locks = {}
+
+_stats_lock = threading.Lock()
+_stats = {"acquired": 0, "contended": 0, "timeouts": 0,
+          "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+# ============================================================================
+# LOCKING
+# ============================================================================
+
+def lock_path(character_name, save_directory="data/save_games"):
+    """Path of a character's lock file"""
+    return os.path.join(save_directory, LOCK_DIR, f"{character_name}.lock")
+
+
+def _record(wait, contended, timed_out=False):
+    with _stats_lock:
+        if timed_out:
+            _stats["timeouts"] += 1
+        else:
+            _stats["acquired"] += 1
+        if contended:
+            _stats["contended"] += 1
+        _stats["wait_seconds"] += wait
+        _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], wait)
+
+
+def _acquire(path, exclusive, timeout):
+    """
+    Take the lock on path, polling until timeout runs out
+
+    Returns: (lock file, or the fallback threading.Lock, and seconds waited).
+             The lock is None for a shared lock whose file can't be created
+    Raises: SaveLockTimeoutError
+            OSError if an exclusive lock's file can't be created
+    """
+    started = time.perf_counter()
+    deadline = started + timeout
+    if fcntl is None:
+        lock = _fallback_locks.setdefault(path, threading.Lock())
+        if not lock.acquire(timeout=max(timeout, 0)):
+            _record(time.perf_counter() - started, True, timed_out=True)
+            raise SaveLockTimeoutError(f"Timed out waiting for lock {path}")
+        wait = time.perf_counter() - started
+        _record(wait, wait > _FIRST_POLL)
+        return lock, wait
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_file = open(path, "a+b")
+    except OSError:
+        if exclusive:
+            raise
+        #Read-only save directory: nobody can write the saves either, so
+        #readers go ahead without a lock
+        return None, 0.0
+    operation = (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB
+    poll = _FIRST_POLL
+    contended = False
+    while True:
+        try:
+            fcntl.flock(lock_file.fileno(), operation)
+            break
+        except BlockingIOError:
+            contended = True
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                lock_file.close()
+                _record(time.perf_counter() - started, True, timed_out=True)
+                raise SaveLockTimeoutError(f"Timed out waiting for lock {path}")
+            time.sleep(min(poll, remaining))
+            poll = min(poll * 2, _MAX_POLL)
+    wait = time.perf_counter() - started
+    _record(wait, contended)
+    return lock_file, wait
+
+
+def _release(lock):
+    if lock is None:
+        return
+    if fcntl is None:
+        lock.release()
+    else:
+        #Closing the file drops the flock
+        lock.close()
+
+
+@contextmanager
+def character_lock(character_name, save_directory="data/save_games", exclusive=False,
+                   timeout=None):
+    """
+    Hold a character's lock for the duration of a with block
+
+    Example:
+        with character_lock("Hero", exclusive=True) as wait:
+            ... write Hero's save ...
+
+    Args:
+        exclusive: Writer lock (True) or shared reader lock (False)
+        timeout: Seconds to wait, default DEFAULT_LOCK_TIMEOUT
+
+    Yields: Seconds spent waiting for the lock (0 if this thread already had it)
+    Raises: SaveLockTimeoutError if the lock wasn't free in time
+            RuntimeError when asking for exclusive while holding only shared
+    """
+    if not exclusive and not os.path.isdir(save_directory):
+        #Nothing to read, and a reader shouldn't create the directory
+        yield 0.0
+        return
+    if timeout is None:
+        timeout = DEFAULT_LOCK_TIMEOUT
+    path = os.path.abspath(lock_path(character_name, save_directory))
+    held = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+
+    entry = held.get(path)
+    if entry is not None:
+        if exclusive and not entry[0]:
+            #Upgrading could deadlock against another reader doing the same
+            raise RuntimeError(f"Cannot upgrade shared lock on '{character_name}' to exclusive")
+        entry[1] += 1
+        try:
+            yield 0.0
+        finally:
+            entry[1] -= 1
+        return
+
+    lock, wait = _acquire(path, exclusive, timeout)
+    held[path] = [exclusive, 1]
+    try:
+        yield wait
+    finally:
+        del held[path]
+        _release(lock)
+
+
+def lock_stats():
+    """
+    Lock wait statistics for this process
+
+    Returns: Dictionary with acquired, contended (had to wait), timeouts,
+             wait_seconds (total), avg_wait_seconds and max_wait_seconds
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["avg_wait_seconds"] = (stats["wait_seconds"] / stats["acquired"]
+                                 if stats["acquired"] else 0.0)
+    return stats
+
+
+def reset_lock_stats():
+    """Zero the lock_stats() counters"""
+    with _stats_lock:
+        for key in _stats:
+            _stats[key] = 0 if isinstance(_stats[key], int) else 0.0
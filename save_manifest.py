@@ -0,0 +1,430 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Manifest Module
+
+Keeps an indexed SQLite list of every save in a save directory: name,
+class, level, gold and last-modified time. character_manager updates it
+on every save and delete, so listing saves (sorted and paged) never has
+to scan the directory or open save files.
+
+The manifest lives in {save_directory}/.manifest/ and remembers the
+directory's mtime from its last update. Updates pass in the mtime from
+just before their write, so a manifest that was already behind stays
+marked stale. If the manifest is missing, or files were added or removed
+behind its back, it rebuilds itself from the save files. If it can't be opened at all (a
+read-only save directory), listings scan the directory instead.
+
+A save file rewritten in place without going through character_manager
+doesn't change the directory mtime. Each row keeps its file's mtime, and
+a paged list_characters() re-reads the rows on the page it returns whose
+file changed, so those rows are right, but such an edit can't move a row
+onto a page it wasn't on. Unpaged listings don't check (they would have
+to stat every save), their names are right either way. Saves that can't
+be read are still listed, with class, level and gold set to None, so
+loading them reports the error.
+
+Level and gold are as of the last full save, journal records show up
+once the journal is compacted.
+"""
+
+import os
+import sqlite3
+import threading
+
+MANIFEST_DIR = ".manifest"
+MANIFEST_FILE = "manifest.db"
+SAVE_SUFFIX = "_save.txt"
+
+# Columns list_characters() can sort by
+SORT_KEYS = ("name", "class", "level", "gold", "mtime")
+DEFAULT_PAGE_SIZE = 50
+
+# Bumped when the saves table changes, older manifests are rebuilt
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    name TEXT PRIMARY KEY,
+    class TEXT,
+    level INTEGER,
+    gold INTEGER,
+    mtime INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS saves_level ON saves (level, name);
+CREATE INDEX IF NOT EXISTS saves_gold ON saves (gold, name);
+CREATE INDEX IF NOT EXISTS saves_mtime ON saves (mtime, name);
+CREATE INDEX IF NOT EXISTS saves_class ON saves (class, name);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Listing falls back to scanning the directory on these, e.g. a read-only
+# save directory where .manifest/ can't be created
+MANIFEST_ERRORS = (OSError, sqlite3.Error)
+
+# One connection per save directory, shared by every thread behind a lock
+_connections = {}
+_lock = threading.RLock()
+
+# ============================================================================
+# CONNECTION
+# ============================================================================
+
+def manifest_path(save_directory="data/save_games"):
+    """Path of the manifest database for a save directory"""
+    return os.path.join(save_directory, MANIFEST_DIR, MANIFEST_FILE)
+
+
+def _open(path):
+    """Connect to a manifest database and make sure it has the current schema"""
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    try:
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        version = connection.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if version is None or version[0] != SCHEMA_VERSION:
+            connection.executescript("DROP TABLE saves; DELETE FROM meta;")
+            connection.executescript(SCHEMA)
+            connection.execute("INSERT INTO meta (key, value) VALUES ('schema', ?)",
+                               (SCHEMA_VERSION,))
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+def _connect(save_directory):
+    """
+    Open (or reuse) the manifest database, building it if it is missing
+
+    Raises: sqlite3.Error if the manifest is locked or can't be written
+    """
+    key = os.path.abspath(save_directory)
+    connection = _connections.get(key)
+    if connection is not None and os.path.exists(manifest_path(save_directory)):
+        return connection
+    if connection is not None:
+        connection.close()
+        del _connections[key]
+
+    #The manifest sits in a subdirectory so its own writes don't change
+    #the save directory's mtime
+    path = manifest_path(save_directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        connection = _open(path)
+    except sqlite3.DatabaseError as e:
+        if isinstance(e, sqlite3.OperationalError):
+            raise
+        #Not a database any more. It only indexes the save files, so start over
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+        connection = _open(path)
+    _connections[key] = connection
+    if connection.execute("SELECT 1 FROM meta WHERE key = 'dir_mtime'").fetchone() is None:
+        rebuild_manifest(save_directory)
+    return connection
+
+
+def directory_mtime(save_directory="data/save_games"):
+    """Current mtime of the save directory (None if it doesn't exist)"""
+    try:
+        return os.stat(save_directory).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _stamp(connection, save_directory, previous_mtime):
+    """
+    Mark the manifest up to date with the directory
+    
+    Only if it was up to date with previous_mtime, the directory mtime
+    from before the caller's write. Otherwise something else changed the
+    directory and the manifest stays stale.
+    """
+    row = connection.execute("SELECT value FROM meta WHERE key = 'dir_mtime'").fetchone()
+    if row is None or row[0] != previous_mtime:
+        return
+    connection.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)",
+        (os.stat(save_directory).st_mtime_ns,)
+    )
+
+
+def is_stale(save_directory="data/save_games"):
+    """
+    Check whether save files changed without the manifest being told
+
+    Returns: True if the manifest needs a rebuild
+    """
+    with _lock:
+        connection = _connect(save_directory)
+        row = connection.execute("SELECT value FROM meta WHERE key = 'dir_mtime'").fetchone()
+        return row is None or row[0] != os.stat(save_directory).st_mtime_ns
+
+
+def _save_mtime(name, save_directory):
+    try:
+        return os.stat(os.path.join(save_directory, f"{name}{SAVE_SUFFIX}")).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# ============================================================================
+# UPDATES
+# ============================================================================
+
+def manifest_entry(character):
+    """The fields of a character the manifest keeps"""
+    return {"name": character["name"], "class": character["class"],
+            "level": character["level"], "gold": character["gold"]}
+
+
+def record_save(character, save_directory="data/save_games", previous_mtime=None):
+    """
+    Add or update a character after its save file was written
+
+    Args:
+        character: Character dictionary (or manifest_entry() of one)
+        previous_mtime: directory_mtime() from before the write
+    """
+    mtime = _save_mtime(character["name"], save_directory)
+    if mtime is None:
+        return
+    with _lock:
+        connection = None
+        try:
+            connection = _connect(save_directory)
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "INSERT OR REPLACE INTO saves (name, class, level, gold, mtime) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (character["name"], character["class"], character["level"],
+                 character["gold"], mtime)
+            )
+            _stamp(connection, save_directory, previous_mtime)
+            connection.execute("COMMIT")
+        except MANIFEST_ERRORS:
+            #The save itself worked (the manifest may be locked or broken),
+            #the manifest just stays stale and gets rebuilt the next time
+            #saves are listed
+            if connection is not None and connection.in_transaction:
+                connection.execute("ROLLBACK")
+
+
+def remove_save(character_name, save_directory="data/save_games", previous_mtime=None):
+    """Drop a character after its save file was deleted (see record_save)"""
+    with _lock:
+        connection = None
+        try:
+            connection = _connect(save_directory)
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute("DELETE FROM saves WHERE name = ?", (character_name,))
+            _stamp(connection, save_directory, previous_mtime)
+            connection.execute("COMMIT")
+        except MANIFEST_ERRORS:
+            #The save itself worked (the manifest may be locked or broken),
+            #the manifest just stays stale and gets rebuilt the next time
+            #saves are listed
+            if connection is not None and connection.in_transaction:
+                connection.execute("ROLLBACK")
+
+
+def _read_row(name, save_directory):
+    """
+    Manifest row for a save file, read straight from the file
+
+    Returns: (name, class, level, gold, mtime), None if the file is gone
+    """
+    import character_manager
+    from custom_exceptions import GameError
+
+    mtime = _save_mtime(name, save_directory)
+    if mtime is None:
+        return None
+    #Read without the character locks (save files are replaced atomically),
+    #since writers take this module's lock while holding theirs. Journals
+    #don't count until compacted anyway.
+    try:
+        character = character_manager.parse_save_data(
+            character_manager.read_save_data(name, save_directory), name)
+    except (GameError, KeyError, ValueError, OSError):
+        return (name, None, None, None, mtime)
+    return (name, character["class"], character["level"], character["gold"], mtime)
+
+
+def _scan_names(save_directory):
+    """Character names of the save files in the directory, unsorted"""
+    return [filename[:-len(SAVE_SUFFIX)] for filename in os.listdir(save_directory)
+            if filename.endswith(SAVE_SUFFIX)]
+
+
+def _scan_rows(save_directory):
+    """Manifest rows for every save file in the directory, read from the files"""
+    rows = (_read_row(name, save_directory) for name in _scan_names(save_directory))
+    return [row for row in rows if row is not None]
+
+
+def rebuild_manifest(save_directory="data/save_games"):
+    """
+    Rebuild the manifest by reading every save file in the directory
+
+    Save files that can't be loaded are listed with class, level and gold None.
+
+    Returns: Number of saves in the manifest
+    """
+    with _lock:
+        connection = _connect(save_directory)
+        #The mtime is taken first, so files added during the scan make it stale again
+        dir_mtime = os.stat(save_directory).st_mtime_ns
+        rows = _scan_rows(save_directory)
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM saves")
+            connection.executemany(
+                "INSERT OR REPLACE INTO saves (name, class, level, gold, mtime) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            connection.execute("INSERT OR REPLACE INTO meta (key, value) "
+                               "VALUES ('dir_mtime', ?)", (dir_mtime,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return len(rows)
+
+# ============================================================================
+# LISTING
+# ============================================================================
+
+def _fresh_connection(save_directory):
+    """Connection to a manifest that matches the directory right now"""
+    if is_stale(save_directory):
+        rebuild_manifest(save_directory)
+    return _connect(save_directory)
+
+
+def _refresh_rows(connection, save_directory, rows):
+    """
+    Re-read rows whose save file was rewritten in place since they were recorded
+
+    Returns: True if any row changed
+    """
+    changed = [row[0] for row in rows if _save_mtime(row[0], save_directory) != row[4]]
+    if not changed:
+        return False
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        for name in changed:
+            row = _read_row(name, save_directory)
+            if row is None:
+                connection.execute("DELETE FROM saves WHERE name = ?", (name,))
+            else:
+                connection.execute(
+                    "INSERT OR REPLACE INTO saves (name, class, level, gold, mtime) "
+                    "VALUES (?, ?, ?, ?, ?)", row)
+        connection.execute("COMMIT")
+    except sqlite3.Error:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        return False
+    return True
+
+
+def _sorted_page(rows, sort_by, descending, page, page_size):
+    """The ORDER BY / LIMIT of list_characters() done in Python (None sorts first)"""
+    column = SORT_KEYS.index(sort_by)
+    rows = sorted(rows, reverse=descending,
+                  key=lambda row: (row[column] is not None,
+                                   row[column] if row[column] is not None else 0, row[0]))
+    if page_size is None:
+        return rows
+    return rows[(page - 1) * page_size:page * page_size]
+
+
+def list_characters(save_directory="data/save_games", sort_by="name", descending=False,
+                    page=1, page_size=DEFAULT_PAGE_SIZE):
+    """
+    List saved characters from the manifest, sorted and paged
+
+    Examples:
+        top 50 by level: list_characters(sort_by="level", descending=True)
+        page 3 by name:  list_characters(page=3)
+
+    Ties are broken by name. page starts at 1, page_size=None lists all.
+    Rows on a page whose save file changed since they were recorded are
+    re-read first (not for page_size=None, which relies on the directory
+    mtime alone).
+
+    Returns: List of dictionaries with name, class, level, gold and mtime
+             (save file modification time in nanoseconds). class, level
+             and gold are None for saves that can't be read
+    Raises: ValueError for an unknown sort_by or a page below 1
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Cannot sort saves by: {sort_by}")
+    if page < 1:
+        raise ValueError("page starts at 1")
+    if not os.path.isdir(save_directory):
+        return []
+
+    direction = "DESC" if descending else "ASC"
+    sql = (f"SELECT name, class, level, gold, mtime FROM saves "
+           f"ORDER BY {sort_by} {direction}, name {direction}")
+    params = ()
+    if page_size is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = (page_size, (page - 1) * page_size)
+    try:
+        with _lock:
+            connection = _fresh_connection(save_directory)
+            rows = connection.execute(sql, params).fetchall()
+            #Only pages: checking every save of a full listing would cost what
+            #the manifest is there to save
+            if page_size is not None and _refresh_rows(connection, save_directory, rows):
+                rows = connection.execute(sql, params).fetchall()
+    except MANIFEST_ERRORS:
+        rows = _sorted_page(_scan_rows(save_directory), sort_by, descending, page, page_size)
+    return [dict(zip(SORT_KEYS, row)) for row in rows]
+
+
+def list_names(save_directory="data/save_games"):
+    """
+    Names of every saved character, sorted, from the manifest
+
+    Reads only the primary key index, so it is what to use when the
+    other columns aren't needed.
+    """
+    if not os.path.isdir(save_directory):
+        return []
+    try:
+        with _lock:
+            rows = _fresh_connection(save_directory).execute(
+                "SELECT name FROM saves ORDER BY name").fetchall()
+    except MANIFEST_ERRORS:
+        return sorted(_scan_names(save_directory))
+    return [row[0] for row in rows]
+
+
+def count_characters(save_directory="data/save_games"):
+    """Number of saves in the directory, from the manifest"""
+    if not os.path.isdir(save_directory):
+        return 0
+    try:
+        with _lock:
+            return _fresh_connection(save_directory).execute(
+                "SELECT COUNT(*) FROM saves").fetchone()[0]
+    except MANIFEST_ERRORS:
+        return len(_scan_names(save_directory))
+
+
+def close_manifests():
+    """Close every open manifest connection"""
+    with _lock:
+        for connection in _connections.values():
+            connection.close()
+        _connections.clear()
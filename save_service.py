@@ -0,0 +1,250 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Service Module
+
+Write-behind autosave for characters. save() takes a snapshot of the
+character and returns right away; one background thread writes the
+snapshots to disk with character_manager's atomic writer.
+
+- Saving the same character again before the first write happened just
+  replaces the pending snapshot (only the latest state gets written)
+- The queue is bounded, save() waits for room when it is full
+- save() returns a Future, call .result() to wait until that state is on disk
+- flush() waits for everything queued, close() flushes and stops the thread
+- The default service used by autosave() is flushed when Python exits
+"""
+
+import os
+import time
+import atexit
+import threading
+from concurrent.futures import Future
+
+import save_locks
+import save_manifest
+from character_manager import (DEFAULT_SAVE_FORMAT, encode_character_save, write_save_file,
+                               attached_journal, remove_journal)
+
+DEFAULT_MAX_PENDING = 64
+
+# ============================================================================
+# SAVE SERVICE
+# ============================================================================
+
+class SaveService:
+    """Background writer for character save files"""
+
+    def __init__(self, save_directory="data/save_games", max_pending=DEFAULT_MAX_PENDING,
+                 save_format=DEFAULT_SAVE_FORMAT):
+        """
+        Args:
+            save_directory: Directory the save files go in
+            max_pending: Most characters that can be waiting to be written
+            save_format: "text" or "binary" (see character_manager)
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.save_directory = save_directory
+        self.max_pending = max_pending
+        self.save_format = save_format
+
+        # filepath -> [save text, manifest entry, futures waiting on it, journal mark],
+        # oldest first
+        self._pending = {}
+        self._writing = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+        self._saves_requested = 0
+        self._saves_coalesced = 0
+        self._writes = 0
+        self._write_errors = 0
+        self._max_queue_depth = 0
+        self._total_write_time = 0.0
+        self._last_write_time = 0.0
+        self._max_write_time = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="save-service", daemon=True)
+        self._thread.start()
+
+    def save(self, character, timeout=None):
+        """
+        Queue a save of the character's current state
+
+        The save text is built now, so later changes to the character
+        don't leak into this save.
+
+        Args:
+            character: Character dictionary
+            timeout: Seconds to wait for room in a full queue (None = forever)
+
+        Returns: Future that resolves to True once the state is on disk
+                 (or raises the error the write failed with)
+        Raises: TimeoutError if the queue stayed full
+                RuntimeError if the service is closed
+        """
+        text = encode_character_save(character, self.save_format)
+        manifest_entry = save_manifest.manifest_entry(character)
+        #The journal position this snapshot covers, see CharacterJournal.rebase
+        journal = attached_journal(character, self.save_directory)
+        journal_mark = (journal, journal.mark()) if journal is not None else None
+        filepath = os.path.join(self.save_directory, f"{character['name']}_save.txt")
+        future = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Save service is closed")
+            self._saves_requested += 1
+
+            #A save already queued for this character needs no new room
+            has_room = self._condition.wait_for(
+                lambda: (filepath in self._pending or len(self._pending) < self.max_pending
+                         or self._closed), timeout)
+            if self._closed:
+                raise RuntimeError("Save service is closed")
+            if not has_room:
+                raise TimeoutError("Save queue is full")
+
+            entry = self._pending.get(filepath)
+            if entry is not None:
+                #Newer snapshot replaces the queued one and keeps its place in line
+                entry[0] = text
+                entry[1] = manifest_entry
+                entry[2].append(future)
+                entry[3] = journal_mark
+                self._saves_coalesced += 1
+            else:
+                self._pending[filepath] = [text, manifest_entry, [future], journal_mark]
+                self._max_queue_depth = max(self._max_queue_depth, len(self._pending))
+                self._condition.notify_all()
+        return future
+
+    def _run(self):
+        """Writer thread: write the oldest pending save until closed and empty"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+                filepath = next(iter(self._pending))
+                text, manifest_entry, futures, journal_mark = self._pending.pop(filepath)
+                self._writing += 1
+                self._condition.notify_all()
+
+            started = time.perf_counter()
+            error = None
+            try:
+                os.makedirs(self.save_directory, exist_ok=True)
+                with save_locks.character_lock(manifest_entry['name'], self.save_directory,
+                                               exclusive=True):
+                    self._write(filepath, text, manifest_entry, journal_mark)
+            except Exception as e:
+                #Whatever went wrong belongs to this save, the thread keeps going
+                error = e
+            elapsed = time.perf_counter() - started
+            for future in futures:
+                if error is None:
+                    future.set_result(True)
+                else:
+                    future.set_exception(error)
+
+            with self._condition:
+                self._writing -= 1
+                self._writes += 1
+                self._total_write_time += elapsed
+                self._last_write_time = elapsed
+                self._max_write_time = max(self._max_write_time, elapsed)
+                if error is not None:
+                    self._write_errors += 1
+                self._condition.notify_all()
+
+    def _write(self, filepath, text, manifest_entry, journal_mark):
+        """Write one snapshot and bring the journal in line (character lock held)"""
+        if journal_mark is not None and not journal_mark[0].is_current(journal_mark[1]):
+            #The journal was compacted or rebased past the snapshot, so the
+            #save on disk is already newer than this one
+            return
+        previous_mtime = save_manifest.directory_mtime(self.save_directory)
+        write_save_file(filepath, text)
+        save_manifest.record_save(manifest_entry, self.save_directory, previous_mtime)
+        #Journal records are absolute values, older ones must not replay over this save
+        if journal_mark is None:
+            remove_journal(manifest_entry['name'], self.save_directory)
+        else:
+            journal_mark[0].rebase(journal_mark[1])
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued save has been written
+
+        Returns: True if the queue drained, False if timeout ran out first
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._writing, timeout)
+
+    def close(self, timeout=None):
+        """Write everything still queued and stop the writer thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def metrics(self):
+        """
+        Current queue and write statistics
+
+        Returns: Dictionary with queue_depth, max_queue_depth, writing,
+                 saves_requested, saves_coalesced, writes, write_errors and
+                 write latency in seconds (last/avg/max_write_seconds)
+        """
+        with self._condition:
+            return {
+                "queue_depth": len(self._pending),
+                "max_queue_depth": self._max_queue_depth,
+                "writing": self._writing,
+                "saves_requested": self._saves_requested,
+                "saves_coalesced": self._saves_coalesced,
+                "writes": self._writes,
+                "write_errors": self._write_errors,
+                "last_write_seconds": self._last_write_time,
+                "avg_write_seconds": self._total_write_time / self._writes if self._writes else 0.0,
+                "max_write_seconds": self._max_write_time
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# ============================================================================
+# DEFAULT SERVICE
+# ============================================================================
+
+_default_services = {}
+_default_lock = threading.Lock()
+
+
+def get_save_service(save_directory="data/save_games"):
+    """
+    Shared service for a save directory, created on first use
+
+    It is closed (and so flushed) when the program exits.
+    """
+    with _default_lock:
+        service = _default_services.get(save_directory)
+        if service is None:
+            service = SaveService(save_directory)
+            _default_services[save_directory] = service
+            atexit.register(service.close)
+        return service
+
+
+def autosave(character, save_directory="data/save_games"):
+    """
+    Queue a write-behind save on the shared service
+
+    Returns: Future that resolves once the save is on disk
+    """
+    return get_save_service(save_directory).save(character)
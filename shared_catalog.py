@@ -0,0 +1,241 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Shared Catalog Module
+
+Lets one loader process publish the parsed quest and item catalogs into a
+packed, memory mapped file that any number of worker processes attach to
+read-only. Workers don't parse anything and the operating system keeps a
+single copy of the pages. Each worker only holds the records it has read
+(or none, with cache=False). Put the files on /dev/shm to keep them in RAM.
+
+Run: python shared_catalog.py <output_dir> [quests_file] [items_file]
+"""
+
+import os
+import sys
+import mmap
+import pickle
+import struct
+from collections.abc import Mapping
+
+import game_data
+from custom_exceptions import MissingDataFileError, CorruptedDataError
+
+MAGIC = b"QCCAT001"
+KIND_CODES = {"quests": 0, "items": 1}
+
+# magic, kind, count, order table offset, sorted table offset
+HEADER = struct.Struct("<8sIIQQ")
+# Per record in catalog order: id offset, id length, record offset, record length
+ORDER_ENTRY = struct.Struct("<QIQI")
+# Per record sorted by id bytes: position in the order table
+SORTED_ENTRY = struct.Struct("<I")
+
+# ============================================================================
+# PUBLISHING
+# ============================================================================
+
+def publish_catalog(catalog, path, kind):
+    """
+    Pack a loaded catalog into a file workers can attach to
+
+    Layout: header, id strings, pickled records, order table, sorted table.
+    The file is written under a temp name and renamed, so workers that
+    are attached keep reading the old file until they reattach.
+
+    Args:
+        catalog: Dictionary from load_quests/load_items (or any mapping)
+        path: File to write
+        kind: "quests" or "items"
+
+    Returns: Number of records published
+    """
+    if kind not in KIND_CODES:
+        raise ValueError(f"Unknown catalog kind: {kind}")
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    entries = []
+    with open(temp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for key, record in catalog.items():
+            key_bytes = key.encode("utf-8")
+            key_offset = f.tell()
+            f.write(key_bytes)
+            record_bytes = pickle.dumps(dict(record), protocol=pickle.HIGHEST_PROTOCOL)
+            record_offset = f.tell()
+            f.write(record_bytes)
+            entries.append((key_bytes, key_offset, record_offset, len(record_bytes)))
+
+        order_offset = f.tell()
+        for key_bytes, key_offset, record_offset, record_length in entries:
+            f.write(ORDER_ENTRY.pack(key_offset, len(key_bytes), record_offset, record_length))
+
+        sorted_offset = f.tell()
+        for position in sorted(range(len(entries)), key=lambda i: entries[i][0]):
+            f.write(SORTED_ENTRY.pack(position))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, KIND_CODES[kind], len(entries), order_offset, sorted_offset))
+    os.replace(temp_path, path)
+    return len(entries)
+
+
+def publish_game_data(output_dir, quest_file="data/quests.txt", item_file="data/items.txt"):
+    """
+    Load both catalogs once and publish them to output_dir
+
+    Returns: Tuple of (quests_path, items_path)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    quests_path = os.path.join(output_dir, "quests.catalog")
+    items_path = os.path.join(output_dir, "items.catalog")
+    publish_catalog(game_data.load_quests(quest_file), quests_path, "quests")
+    publish_catalog(game_data.load_items(item_file), items_path, "items")
+    return quests_path, items_path
+
+# ============================================================================
+# ATTACHING
+# ============================================================================
+
+class SharedCatalog(Mapping):
+    """
+    Read-only view of a published catalog
+
+    Attaching only maps the file and reads the header. Lookups binary
+    search the sorted id table and unpickle just the one record. Each
+    process keeps the records it has unpickled (and where the ids it
+    looked up are), so repeated lookups and values() calls only copy
+    them. Every lookup returns a fresh dict the
+    caller can't use to change the shared data (record values are
+    strings, numbers and tuples, so a shallow copy is enough). Works as a
+    quest_data_dict or item_data_dict.
+    """
+
+    def __init__(self, path, cache=True):
+        """
+        Args:
+            path: File written by publish_catalog
+            cache: Keep unpickled records in this process. False unpickles
+                   on every lookup and keeps no private copy at all
+
+        Raises: MissingDataFileError if path doesn't exist
+                CorruptedDataError if it isn't a published catalog
+        """
+        try:
+            with open(path, "rb") as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise MissingDataFileError(f"Shared catalog is not found: {path}")
+        except (OSError, ValueError):
+            raise CorruptedDataError(f"Shared catalog is unreadable: {path}")
+
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise CorruptedDataError(f"Shared catalog is truncated: {path}")
+        magic, kind_code, count, order_offset, sorted_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or kind_code not in KIND_CODES.values():
+            self._map.close()
+            raise CorruptedDataError(f"Not a shared catalog: {path}")
+
+        self.path = path
+        self.kind = "quests" if kind_code == KIND_CODES["quests"] else "items"
+        self._count = count
+        self._order_offset = order_offset
+        self._sorted_offset = sorted_offset
+        # position -> unpickled record, and id -> position of ids looked
+        # up, filled in as they are read
+        self._records = [None] * count if cache else None
+        self._positions = {} if cache else None
+
+    def _entry(self, position):
+        return ORDER_ENTRY.unpack_from(self._map, self._order_offset + position * ORDER_ENTRY.size)
+
+    def _key_bytes(self, position):
+        key_offset, key_length, _record_offset, _record_length = self._entry(position)
+        return self._map[key_offset:key_offset + key_length]
+
+    def _decode(self, position):
+        _key_offset, _key_length, record_offset, record_length = self._entry(position)
+        return pickle.loads(self._map[record_offset:record_offset + record_length])
+
+    def _record(self, position):
+        """Copy of the record at an order position, unpickled once per process"""
+        if self._records is None:
+            return self._decode(position)
+        record = self._records[position]
+        if record is None:
+            record = self._records[position] = self._decode(position)
+        return dict(record)
+
+    def _find(self, key):
+        """Order position of an id, or None"""
+        if not isinstance(key, str):
+            return None
+        if self._positions is not None:
+            position = self._positions.get(key)
+            if position is None:
+                position = self._search(key)
+                if position is not None:
+                    self._positions[key] = position
+            return position
+        return self._search(key)
+
+    def _search(self, key):
+        """Binary search the sorted table, returns an order position or None"""
+        target = key.encode("utf-8")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            position = SORTED_ENTRY.unpack_from(
+                self._map, self._sorted_offset + middle * SORTED_ENTRY.size)[0]
+            current = self._key_bytes(position)
+            if current == target:
+                return position
+            if current < target:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __getitem__(self, key):
+        position = self._find(key)
+        if position is None:
+            raise KeyError(key)
+        return self._record(position)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __iter__(self):
+        for position in range(self._count):
+            yield self._key_bytes(position).decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def values(self):
+        #Walk the records in catalog order without searching
+        return [self._record(position) for position in range(self._count)]
+
+    def items(self):
+        return [(self._key_bytes(position).decode("utf-8"), self._record(position))
+                for position in range(self._count)]
+
+    def close(self):
+        """Unmap the file"""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python shared_catalog.py <output_dir> [quests_file] [items_file]")
+        sys.exit(1)
+    quests_path, items_path = publish_game_data(*sys.argv[1:4])
+    print(f"Published {quests_path} and {items_path}")
@@ -160,6 +160,22 @@ def test_invalid_data_format_exception():
     finally:
         os.remove("test_bad_data.txt")
 
+def test_streamed_format_error_has_location(tmp_path):
+    """Test that iter_quests reports the file and line of a bad block"""
+    quest_file = tmp_path / "quests.txt"
+    quest_file.write_text(
+        "QUEST_ID: a\nTITLE: A\nDESCRIPTION: A\nREWARD_XP: 1\n"
+        "REWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n\n"
+        "QUEST_ID: b\nREWARD_XP: lots\n"
+    )
+    quests = game_data.iter_quests(str(quest_file))
+    assert next(quests)['quest_id'] == 'a'
+
+    with pytest.raises(InvalidDataFormatError) as error:
+        next(quests)
+    assert error.value.filename == str(quest_file)
+    assert error.value.line_number == 9
+
 # ============================================================================
 # COMBAT EXCEPTION TESTS
 # ============================================================================
@@ -6,6 +6,8 @@ Tests that modules work together correctly
 import pytest
 import sys
 import os
+import random
+import pickle
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -14,6 +16,9 @@ import inventory_system
 import quest_handler
 import combat_system
 import game_data
+from custom_exceptions import (CorruptedDataError, SaveFileCorruptedError, CharacterNotFoundError,
+                               InvalidSaveDataError, SaveLockTimeoutError, MissingDataFileError,
+                               InvalidDataFormatError)
 
 # ============================================================================
 # CHARACTER INTEGRATION TESTS
@@ -54,6 +59,66 @@ def test_character_leveling_system():
     assert char['max_health'] > original_health
     assert char['health'] == char['max_health']  # Health restored on level up
 
+def _level_up_one_at_a_time(character, xp_amount):
+    """The original gain_experience loop, kept as the reference"""
+    level_up_xp = character['level'] * 100
+    character['experience'] += xp_amount
+    while character['experience'] >= level_up_xp:
+        character['experience'] -= level_up_xp
+        character['level'] += 1
+        character['max_health'] += 10
+        character['strength'] += 2
+        character['magic'] += 2
+        character['health'] = character['max_health']
+        level_up_xp = character['level'] * 100
+
+def test_closed_form_leveling_matches_loop():
+    """Test that big XP awards level up exactly like the step by step loop"""
+    rng = random.Random(21)
+    for _ in range(3000):
+        char = character_manager.create_character("CurveTest", "Warrior")
+        char['level'] = rng.randint(0, 60)
+        char['experience'] = rng.randint(-200, 6000)
+        char['health'] = rng.randint(1, 100)
+        xp = rng.choice([rng.randint(-500, 500), rng.randint(0, 5_000_000)])
+        expected = dict(char)
+        _level_up_one_at_a_time(expected, xp)
+        character_manager.gain_experience(char, xp)
+        assert char == expected
+
+    assert character_manager.total_xp_for_level(3) == 300
+    assert character_manager.level_for_total_xp(299) == 2
+    assert character_manager.level_for_total_xp(300) == 3
+    big = character_manager.total_xp_for_level(5000)
+    assert character_manager.level_for_total_xp(big - 1) == 4999
+    assert character_manager.xp_until_level({'level': 2, 'experience': 50}, 3) == 150
+
+def test_character_objects_work_like_dicts(tmp_path):
+    """Test that slotted Character objects go through the game like dicts"""
+    char = character_manager.create_character("SlotTest", "Cleric", as_object=True)
+    plain = character_manager.create_character("SlotTest", "Cleric")
+    assert isinstance(char, character_manager.Character)
+    assert char == plain and char.to_dict() == plain
+    assert char.level == char['level'] == 1
+    assert not hasattr(char, '__dict__')
+
+    char['gold'] += 500
+    character_manager.gain_experience(char, 250)
+    inventory_system.add_item_to_inventory(char, "health_potion")
+    char['game_data'] = {"note": "extra keys are kept"}
+    assert 'game_data' in char and char['game_data']['note']
+    del char['game_data']
+    assert 'game_data' not in char
+    with pytest.raises(KeyError):
+        char['missing']
+
+    assert pickle.loads(pickle.dumps(char)) == char
+    save_dir = str(tmp_path)
+    assert character_manager.save_character(char, save_dir)
+    loaded = character_manager.load_character("SlotTest", save_dir, as_object=True)
+    assert isinstance(loaded, character_manager.Character)
+    assert loaded == char and loaded.inventory == ["health_potion"]
+
 def test_character_gold_management():
     """Test adding and spending gold"""
     char = character_manager.create_character("GoldTest", "Rogue")
@@ -69,6 +134,450 @@ def test_character_gold_management():
     with pytest.raises(ValueError):
         character_manager.add_gold(char, -1000)
 
+def test_save_service_coalesces_and_flushes(tmp_path):
+    """Test that write-behind saves keep only the latest state and reach disk"""
+    import save_service
+
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("AutosaveTest", "Rogue")
+    other = character_manager.create_character("OtherAutosave", "Cleric")
+
+    with save_service.SaveService(save_dir, max_pending=2) as service:
+        pending = []
+        for gold in range(100, 150):
+            char['gold'] = gold
+            pending.append(service.save(char))
+        service.save(other)
+        char['gold'] = 0  # Changed after the last save, must not be written
+
+        assert pending[-1].result(timeout=5) is True
+        assert service.flush(timeout=5)
+        assert all(future.done() for future in pending)
+        metrics = service.metrics()
+
+    assert character_manager.load_character("AutosaveTest", save_dir)['gold'] == 149
+    assert character_manager.load_character("OtherAutosave", save_dir)['name'] == "OtherAutosave"
+    assert metrics['queue_depth'] == 0
+    assert metrics['saves_requested'] == 51
+    assert metrics['writes'] + metrics['saves_coalesced'] == 51
+    assert metrics['write_errors'] == 0
+    assert metrics['max_write_seconds'] >= metrics['avg_write_seconds'] > 0
+    assert not [name for name in os.listdir(save_dir) if name.endswith(".tmp")]
+
+    with pytest.raises(RuntimeError):
+        service.save(char)
+
+def test_journaled_saves_replay_and_compact(tmp_path):
+    """Test that journaled changes survive a reload and get compacted"""
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("JournalTest", "Warrior")
+    quests = {'q1': {'quest_id': 'q1', 'reward_xp': 150, 'reward_gold': 40,
+                     'required_level': 1, 'prerequisite': 'NONE'}}
+    journal = character_manager.attach_journal(char, save_dir, max_entries=5)
+    try:
+        character_manager.add_gold(char, 25)
+        inventory_system.add_item_to_inventory(char, "health_potion")
+        quest_handler.accept_quest(char, 'q1', quests)
+        char['health'] = 40
+        character_manager.heal_character(char, 10)
+        assert journal.entries == 4
+        with pytest.raises(ValueError):
+            character_manager.add_gold(char, -1000)  # Mutates before raising, not recorded
+        assert journal.entries == 4
+
+        journal_file = character_manager.journal_path("JournalTest", save_dir)
+        with open(journal_file, "a") as f:
+            f.write('{"gold":')  # Record cut off by a crash
+        loaded = character_manager.load_character("JournalTest", save_dir)
+        #The failed add_gold's change waits for the next record
+        assert loaded == dict({key: char[key] for key in loaded}, gold=char['gold'] + 1000)
+        assert loaded['health'] == 50
+
+        quest_handler.complete_quest(char, 'q1', quests)
+    finally:
+        character_manager.detach_journal(char)
+
+    assert journal.compactions == 2 and journal.entries == 0
+    assert not os.path.exists(journal_file)
+    loaded = character_manager.load_character("JournalTest", save_dir)
+    assert loaded['completed_quests'] == ['q1']
+    assert loaded['gold'] == char['gold']
+    assert loaded['inventory'] == ["health_potion"]
+
+    #One record per action, not one per nested journaled call
+    armed = character_manager.create_character("Armed", "Warrior")
+    items = {"iron_sword": {"type": "weapon", "effect": "strength:5"},
+             "steel_sword": {"type": "weapon", "effect": "strength:8"}}
+    armed['game_data'] = {"items": items}  # unequip_weapon looks the old weapon up here
+    armed['inventory'] = ["iron_sword", "steel_sword"]
+    journal = character_manager.attach_journal(armed, save_dir)
+    try:
+        inventory_system.equip_weapon(armed, "iron_sword", items["iron_sword"])
+        inventory_system.equip_weapon(armed, "steel_sword", items["steel_sword"])
+        assert journal.entries == 2
+    finally:
+        character_manager.detach_journal(armed)
+    loaded = character_manager.load_character("Armed", save_dir)
+    assert loaded['equipped_weapon'] == "steel_sword" and loaded['inventory'] == ["iron_sword"]
+
+def test_autosave_with_journal_attached(tmp_path):
+    """Test that service saves of a journaled character don't get undone by old records"""
+    import save_locks
+    import save_service
+
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("AutoJournal", "Cleric")
+    journal = character_manager.attach_journal(char, save_dir)
+    try:
+        with save_service.SaveService(save_dir) as service:
+            character_manager.add_gold(char, 25)  # Journal records gold 125
+            char['gold'] = 500
+            assert service.save(char).result(timeout=5) is True
+            assert character_manager.load_character("AutoJournal", save_dir)['gold'] == 500
+            assert journal.entries == 0
+
+            char['gold'] = 125  # Back to what the old record said, must be recorded now
+            character_manager.add_gold(char, 0)
+            assert character_manager.load_character("AutoJournal", save_dir)['gold'] == 125
+
+            #Records made after the snapshot was queued stay and replay on top of it
+            with save_locks.character_lock("AutoJournal", save_dir, exclusive=True):
+                pending = service.save(char)
+                character_manager.add_gold(char, 10)
+                inventory_system.add_item_to_inventory(char, "health_potion")
+            assert pending.result(timeout=5) is True
+            assert journal.entries == 2
+            loaded = character_manager.load_character("AutoJournal", save_dir)
+            assert loaded['gold'] == 135 and loaded['inventory'] == ["health_potion"]
+
+            #A compaction after the snapshot makes the queued snapshot obsolete
+            with save_locks.character_lock("AutoJournal", save_dir, exclusive=True):
+                pending = service.save(char)
+                character_manager.add_gold(char, 5)
+                journal.compact()
+            assert pending.result(timeout=5) is True
+            assert character_manager.load_character("AutoJournal", save_dir)['gold'] == 140
+
+            #Two snapshots queued at once: the second one's mark has to
+            #survive the first one's rebase
+            character_manager.add_gold(char, 1)  # A record the first snapshot covers
+            with save_locks.character_lock("AutoJournal", save_dir, exclusive=True):
+                first = service.save(char)
+                while not service.metrics()['writing']:
+                    pass  # Writer took the first snapshot and waits for the lock
+                character_manager.add_gold(char, 2)
+                second = service.save(char)
+                character_manager.add_gold(char, 3)
+            assert first.result(timeout=5) is True and second.result(timeout=5) is True
+            assert char['gold'] == 146
+            assert character_manager.load_character("AutoJournal", save_dir)['gold'] == 146
+
+            #A snapshot older than a direct save_character isn't written over it
+            with save_locks.character_lock("AutoJournal", save_dir, exclusive=True):
+                stale = service.save(char)
+                character_manager.add_gold(char, 5)
+                character_manager.save_character(char, save_dir)
+            assert stale.result(timeout=5) is True
+            assert character_manager.load_character("AutoJournal", save_dir)['gold'] == 151
+    finally:
+        character_manager.detach_journal(char)
+
+def test_binary_saves_load_and_convert(tmp_path):
+    """Test that binary saves round trip, are detected on load and convert back"""
+    import convert_saves
+
+    save_dir = str(tmp_path)
+    char = character_manager.create_character("BinaryTest", "Mage")
+    char['inventory'] = ["health_potion", "health_potion", "café_sword"]
+    char['completed_quests'] = ["q1", "q2"]
+    char['equipped_armor'] = "leather_armor"
+    character_manager.save_character(char, save_dir, save_format="binary")
+
+    save_file = os.path.join(save_dir, "BinaryTest_save.txt")
+    with open(save_file, "rb") as f:
+        data = f.read()
+    assert data.startswith(character_manager.BINARY_SAVE_MAGIC)
+    assert character_manager.load_character("BinaryTest", save_dir) == char
+
+    assert convert_saves.convert_saves("text", save_directory=save_dir) == {"BinaryTest": None}
+    with open(save_file) as f:
+        assert f.readline() == "NAME: BinaryTest\n"
+    assert character_manager.load_character("BinaryTest", save_dir) == char
+
+    with open(save_file, "wb") as f:
+        f.write(data[:-3])
+    with pytest.raises(SaveFileCorruptedError):
+        character_manager.load_character("BinaryTest", save_dir)
+
+def test_save_manifest_lists_sorts_and_rebuilds(tmp_path, monkeypatch):
+    """Test that the save manifest tracks saves and repairs itself"""
+    import save_manifest
+
+    save_dir = str(tmp_path)
+    for index, name in enumerate(["Cara", "Abe", "Dot", "Bo"]):
+        char = character_manager.create_character(name, "Rogue")
+        char['level'] = index + 1
+        character_manager.save_character(char, save_dir)
+    assert not save_manifest.is_stale(save_dir)
+
+    assert character_manager.list_saved_characters(save_dir) == ["Abe", "Bo", "Cara", "Dot"]
+    top = save_manifest.list_characters(save_dir, sort_by="level", descending=True, page_size=2)
+    assert [(entry['name'], entry['level']) for entry in top] == [("Bo", 4), ("Dot", 3)]
+    assert [entry['name'] for entry in save_manifest.list_characters(save_dir, page=2, page_size=3)] == ["Dot"]
+
+    character_manager.delete_character("Abe", save_dir)
+    assert not save_manifest.is_stale(save_dir)
+    assert save_manifest.count_characters(save_dir) == 3
+
+    #A save written without the manifest knowing makes it rebuild
+    other_dir = str(tmp_path / "other")
+    character_manager.save_character(character_manager.create_character("Eve", "Mage"), other_dir)
+    os.replace(os.path.join(other_dir, "Eve_save.txt"), os.path.join(save_dir, "Eve_save.txt"))
+    assert save_manifest.is_stale(save_dir)
+    assert character_manager.list_saved_characters(save_dir) == ["Bo", "Cara", "Dot", "Eve"]
+
+    save_manifest.close_manifests()
+    os.remove(save_manifest.manifest_path(save_dir))
+    assert save_manifest.count_characters(save_dir) == 4
+
+    #Unreadable saves are still listed, with no stats
+    with open(os.path.join(save_dir, "Broken_save.txt"), "w") as f:
+        f.write("NAME: Broken\nLEVEL: one\n")
+    assert "Broken" in character_manager.list_saved_characters(save_dir)
+    broken = save_manifest.list_characters(save_dir, sort_by="level", page_size=1)[0]
+    assert broken['name'] == "Broken" and broken['level'] is None
+
+    #A save rewritten in place (same directory mtime) is re-read when listed
+    dot = character_manager.load_character("Dot", save_dir)
+    dot['level'] = 50
+    dot_file = os.path.join(save_dir, "Dot_save.txt")
+    dir_mtime = os.stat(save_dir).st_mtime_ns
+    with open(dot_file, "w") as f:
+        f.write(character_manager.format_character_save(dot))
+    os.utime(dot_file, ns=(dir_mtime + 10**9, dir_mtime + 10**9))
+    assert not save_manifest.is_stale(save_dir)
+    top = save_manifest.list_characters(save_dir, sort_by="level", descending=True, page_size=5)
+    assert [entry['name'] for entry in top if entry['name'] == "Dot"] == ["Dot"]
+    assert next(entry for entry in top if entry['name'] == "Dot")['level'] == 50
+
+    #Full listings don't stat every save file
+    def no_stat(*args):
+        raise AssertionError("save file was checked")
+
+    monkeypatch.setattr(save_manifest, "_save_mtime", no_stat)
+    assert len(save_manifest.list_characters(save_dir, page_size=None)) == 5
+    assert character_manager.list_saved_characters(save_dir) == ["Bo", "Broken", "Cara", "Dot", "Eve"]
+
+def test_broken_manifest_does_not_fail_saves(tmp_path, monkeypatch):
+    """Test that a corrupt or locked manifest leaves saves working and gets rebuilt"""
+    import sqlite3
+    import save_manifest
+    import save_service
+
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Ann", "Rogue"), save_dir)
+    save_manifest.close_manifests()
+    with open(save_manifest.manifest_path(save_dir), "wb") as f:
+        f.write(b"not a database" * 100)
+    assert character_manager.save_character(character_manager.create_character("Ben", "Mage"),
+                                            save_dir) is True
+    assert character_manager.list_saved_characters(save_dir) == ["Ann", "Ben"]
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(save_manifest, "_connect", locked)
+    assert character_manager.delete_character("Ann", save_dir) is True
+    #The writer thread reports errors on the save's future and keeps going
+    monkeypatch.setattr(save_manifest, "record_save", locked)
+    with save_service.SaveService(save_dir) as service:
+        with pytest.raises(sqlite3.OperationalError):
+            service.save(character_manager.create_character("Cat", "Cleric")).result(timeout=5)
+        monkeypatch.undo()
+        assert service.save(character_manager.create_character("Dan", "Cleric")).result(timeout=5)
+        assert service.flush(timeout=5)
+    assert character_manager.list_saved_characters(save_dir) == ["Ben", "Cat", "Dan"]
+
+def test_read_only_save_directory(tmp_path, monkeypatch):
+    """Test that saves can be listed from a directory nothing can be created in"""
+    import save_manifest
+
+    save_dir = str(tmp_path)
+    for index, name in enumerate(["Ria", "Oz"]):
+        char = character_manager.create_character(name, "Warrior")
+        char['level'] = index + 1
+        with open(os.path.join(save_dir, f"{name}_save.txt"), "w") as f:
+            f.write(character_manager.format_character_save(char))
+
+    def read_only(*args, **kwargs):
+        raise PermissionError("Read-only file system")
+
+    monkeypatch.setattr(os, "makedirs", read_only)
+    assert character_manager.list_saved_characters(save_dir) == ["Oz", "Ria"]
+    top = save_manifest.list_characters(save_dir, sort_by="level", descending=True, page_size=1)
+    assert [(entry['name'], entry['level']) for entry in top] == [("Oz", 2)]
+    assert save_manifest.count_characters(save_dir) == 2
+    assert not os.path.exists(os.path.join(save_dir, save_manifest.MANIFEST_DIR))
+    assert character_manager.load_character("Oz", save_dir)['level'] == 2
+
+def test_bulk_character_loading_collects_errors(tmp_path):
+    """Test parallel loading in order, as completed and with parser processes"""
+    save_dir = str(tmp_path)
+    names = [f"Bulk{i}" for i in range(30)]
+    for i, name in enumerate(names):
+        char = character_manager.create_character(name, "Cleric")
+        char['gold'] = i
+        character_manager.save_character(char, save_dir, "binary" if i % 2 else "text")
+    with open(os.path.join(save_dir, "Broken_save.txt"), "w") as f:
+        f.write("NAME: Broken\nLEVEL: one\n")
+
+    wanted = names[:10] + ["Missing", "Broken"] + names[10:]
+    characters, errors = character_manager.load_characters(wanted, save_dir, workers=4)
+    assert list(characters) == names
+    assert [characters[name]['gold'] for name in names] == list(range(30))
+    assert isinstance(errors["Missing"], CharacterNotFoundError)
+    assert isinstance(errors["Broken"], InvalidSaveDataError)
+
+    finished = list(character_manager.iter_load_characters(wanted, save_dir, workers=4,
+                                                            processes=2, ordered=False))
+    assert sorted(name for name, _char, _error in finished) == sorted(wanted)
+    assert {name: char for name, char, error in finished if error is None} == characters
+
+    everyone = {name: error for name, char, error
+                in character_manager.iter_saved_characters(save_dir)}
+    assert set(everyone) == set(names) | {"Broken"}
+    assert isinstance(everyone.pop("Broken"), InvalidSaveDataError)
+    assert not any(everyone.values())
+
+def test_character_cache_hits_invalidates_and_evicts(tmp_path):
+    """Test the LRU character cache in front of load_character"""
+    save_dir = str(tmp_path)
+    cache = character_manager.CharacterCache(max_entries=2)
+    for name in ["Ann", "Ben", "Cal"]:
+        character_manager.save_character(character_manager.create_character(name, "Mage"), save_dir)
+
+    first = cache.load("Ann", save_dir)
+    first['inventory'].append("stolen_item")  # Must not reach the cached copy
+    second = cache.load("Ann", save_dir)
+    assert second['inventory'] == []
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+    #Changed on disk behind the cache's back
+    changed = dict(second, gold=999, inventory=["health_potion"])
+    character_manager.write_save_file(os.path.join(save_dir, "Ann_save.txt"),
+                                      character_manager.format_character_save(changed))
+    assert cache.load("Ann", save_dir)['gold'] == 999
+
+    cache.load("Ben", save_dir)
+    cache.load("Cal", save_dir)
+    assert cache.stats()['evictions'] == 1 and cache.stats()['entries'] == 2
+    assert cache.get("Ann", save_dir) is None
+
+    #The shared cache is written through by saves and cleared by deletes
+    character_manager.character_cache.clear()
+    ben = character_manager.load_character("Ben", save_dir)
+    ben['gold'] = 5
+    character_manager.save_character(ben, save_dir)
+    hits = character_manager.character_cache.stats()['hits']
+    assert character_manager.load_character("Ben", save_dir, use_cache=True)['gold'] == 5
+    assert character_manager.character_cache.stats()['hits'] == hits + 1
+    character_manager.delete_character("Ben", save_dir)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Ben", save_dir, use_cache=True)
+
+def test_save_locks_keep_concurrent_saves_whole(tmp_path, monkeypatch):
+    """Test that concurrent saves and loads of one character never see a mixed save"""
+    import threading
+    import save_locks
+
+    save_dir = str(tmp_path)
+    character_manager.save_character(character_manager.create_character("Locked", "Rogue"),
+                                     save_dir)
+    failures = []
+
+    def writer(offset):
+        char = character_manager.create_character("Locked", "Rogue")
+        for k in range(40):
+            char['gold'] = offset + k
+            char['inventory'] = ["health_potion"] * k
+            if not character_manager.save_character(char, save_dir):
+                failures.append("save failed")
+
+    def reader():
+        for _ in range(80):
+            char = character_manager.load_character("Locked", save_dir)
+            if len(char['inventory']) != char['gold'] % 1000:
+                failures.append(char)
+
+    save_locks.reset_lock_stats()
+    threads = ([threading.Thread(target=writer, args=(i * 1000,)) for i in range(3)]
+               + [threading.Thread(target=reader) for _ in range(3)])
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert failures == []
+    stats = save_locks.lock_stats()
+    assert stats['acquired'] >= 360 and stats['timeouts'] == 0
+    assert stats['max_wait_seconds'] >= stats['avg_wait_seconds'] >= 0
+
+    #A writer holding the lock past the timeout makes other threads give up
+    monkeypatch.setattr(save_locks, "DEFAULT_LOCK_TIMEOUT", 0.05)
+    errors = []
+    with save_locks.character_lock("Locked", save_dir, exclusive=True):
+        thread = threading.Thread(target=lambda: errors.append(pytest.raises(
+            SaveLockTimeoutError, character_manager.load_character, "Locked", save_dir)))
+        thread.start()
+        thread.join()
+        #The same thread can take its own lock again
+        assert character_manager.load_character("Locked", save_dir)['name'] == "Locked"
+    assert len(errors) == 1 and save_locks.lock_stats()['timeouts'] == 1
+
+def test_async_persistence_api(tmp_path):
+    """Test the asyncio save/load/list/delete wrappers, timeouts and cancellation"""
+    import asyncio
+    import threading
+    import async_persistence
+
+    save_dir = str(tmp_path)
+    gate = threading.Event()
+
+    async def scenario():
+        async with async_persistence.AsyncCharacterStore(save_dir, max_workers=1,
+                                                         max_pending=2) as store:
+            char = character_manager.create_character("AsyncHero", "Mage")
+            saving = asyncio.ensure_future(store.save_character(char))
+            char['gold'] = 0  # Changed after save() was called, must not be written
+            assert await saving is True
+            loaded = await store.load_character("AsyncHero")
+            assert loaded['gold'] == 100
+            assert await store.list_saved_characters() == ["AsyncHero"]
+
+            with pytest.raises(CharacterNotFoundError):
+                await store.load_character("Nobody")
+            (tmp_path / "Broken_save.txt").write_text("NAME: Broken\nLEVEL: x\n")
+            with pytest.raises(InvalidSaveDataError):
+                await store.load_character("Broken")
+
+            #Tie up the only worker, then time out and cancel queued calls
+            blocker = asyncio.ensure_future(store._call(None, gate.wait))
+            await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await store.load_character("AsyncHero", timeout=0.05)
+            queued = asyncio.ensure_future(store.delete_character("AsyncHero"))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            gate.set()
+            await blocker
+
+            assert (await store.load_character("AsyncHero"))['name'] == "AsyncHero"
+            assert await store.delete_character("AsyncHero") is True
+            assert await store.list_saved_characters() == ["Broken"]
+
+    asyncio.run(scenario())
+
 # ============================================================================
 # INVENTORY INTEGRATION TESTS
 # ============================================================================
@@ -104,6 +613,35 @@ def test_equipment_system():
     assert 'equipped_weapon' in char
     assert char['equipped_weapon'] == "iron_sword"
 
+def test_multi_stat_equipment():
+    """Test that compiled multi-stat effects apply and come off cleanly"""
+    char = character_manager.create_character("MultiStatTest", "Mage")
+    items = {
+        'battle_staff': game_data.parse_item_block([
+            "ITEM_ID: battle_staff", "NAME: Battle Staff", "TYPE: weapon",
+            "EFFECT: strength:5,magic:3", "COST: 10", "DESCRIPTION: Test"
+        ])
+    }
+    assert items['battle_staff']['effects'] == (("strength", 5), ("magic", 3))
+    char['game_data'] = {'items': items}
+    strength, magic = char['strength'], char['magic']
+
+    inventory_system.add_item_to_inventory(char, 'battle_staff')
+    inventory_system.equip_weapon(char, 'battle_staff', items['battle_staff'])
+    assert (char['strength'], char['magic']) == (strength + 5, magic + 3)
+
+    inventory_system.unequip_weapon(char)
+    assert (char['strength'], char['magic']) == (strength, magic)
+
+    #An unknown stat is rejected before any stat changes
+    char['inventory'] += ['battle_staff', 'odd_staff']
+    inventory_system.equip_weapon(char, 'battle_staff', items['battle_staff'])
+    odd_staff = {'type': 'weapon', 'effect': 'magic:4,luck:2'}
+    with pytest.raises(InvalidDataFormatError):
+        inventory_system.equip_weapon(char, 'odd_staff', odd_staff)
+    assert (char['strength'], char['magic']) == (strength + 5, magic + 3)
+    assert char['equipped_weapon'] == 'battle_staff' and 'battle_staff' not in char['inventory']
+
 def test_shop_system():
     """Test buying and selling items"""
     char = character_manager.create_character("ShopTest", "Mage")
@@ -123,6 +661,89 @@ def test_shop_system():
     assert gold_received == 12  # Half of cost (25 // 2)
     assert "health_potion" not in char['inventory']
 
+def test_item_table_shop_queries():
+    """Test vectorized shop listings against the item catalog"""
+    pytest.importorskip("numpy")
+    import item_table
+
+    items = game_data.load_items("data/items.txt")
+    table = item_table.ItemTable(items)
+    assert len(table) == len(items)
+
+    weapons = table.query("weapon", max_cost=200, sort_by="effect_value", descending=True)
+    assert weapons == ['fire_staff', 'iron_sword']
+    assert table.top_k(1, item_type="armor", stat="max_health") == ['steel_armor']
+
+    affordable = table.affordable_items([0, 60], item_type="consumable")
+    assert affordable[0] == []
+    assert affordable[1] == [item_id for item_id, item in items.items()
+                             if item['type'] == 'consumable' and item['cost'] <= 60]
+
+def test_roster_bulk_updates_match_scalar_functions(tmp_path):
+    """Test that vectorized roster updates give what the per-character functions give"""
+    np = pytest.importorskip("numpy")
+    import roster
+
+    save_dir = str(tmp_path)
+    rng = random.Random(23)
+    expected = []
+    for i in range(200):
+        char = character_manager.create_character(f"Roster{i}", "Warrior")
+        char['level'] = rng.randint(0, 40)
+        char['experience'] = rng.randint(-100, 3000)
+        char['health'] = rng.randint(-10, 120)
+        char['gold'] = rng.randint(0, 300)
+        character_manager.save_character(char, save_dir)
+        expected.append(char)
+
+    team, errors = roster.load_roster(save_directory=save_dir)
+    assert errors == {} and len(team) == 200
+    team, errors = roster.load_roster([char['name'] for char in expected], save_dir)
+    xp = [rng.randint(0, 500_000) for _ in expected]
+    gained = team.grant_xp(xp)
+    paid = team.add_gold(-150)
+    healed = team.heal(25)
+    revived = team.revive(where=team.level < 20)
+
+    for i, char in enumerate(expected):
+        assert gained[i] == (char['health'] > 0)
+        if gained[i]:
+            character_manager.gain_experience(char, xp[i])
+        assert paid[i] == (char['gold'] >= 150)
+        if paid[i]:
+            character_manager.add_gold(char, -150)
+        assert healed[i] == character_manager.heal_character(char, 25)
+        assert revived[i] == (char['level'] < 20 and char['health'] <= 0)
+        if revived[i]:
+            character_manager.revive_character(char)
+    assert team.to_characters() == expected
+
+    assert team.save(save_dir) == []
+    assert not team.changed().any()
+    for char in expected[:5]:
+        assert character_manager.load_character(char['name'], save_dir) == char
+
+    #Around the int64 limits: big rows are leveled exactly, not wrapped
+    big = [character_manager.create_character(f"Big{i}", "Mage") for i in range(4)]
+    big[1]['level'] = roster._BULK_LEVEL + 1
+    big[2]['experience'] = roster._BULK_XP
+    big_xp = [5 * 10**18, 10**12, roster._BULK_XP, roster._BULK_XP + 1]
+    team = roster.Roster(big)
+    assert team.grant_xp(big_xp).all()
+    for char, xp in zip(big, big_xp):
+        character_manager.gain_experience(char, xp)
+    assert team.to_characters() == big
+    assert big[0]['level'] == 316227766
+    limit = np.array([roster.MAX_CURVE_XP])
+    assert (roster.levels_for_total_xp(limit)[0]
+            == character_manager.level_for_total_xp(roster.MAX_CURVE_XP))
+    with pytest.raises(OverflowError):
+        roster.levels_for_total_xp(limit + 1)
+    for too_big in (2**63, 2**64):
+        with pytest.raises(OverflowError):
+            team.grant_xp(too_big)
+    assert team.to_characters() == big
+
 # ============================================================================
 # QUEST INTEGRATION TESTS
 # ============================================================================
@@ -274,6 +895,266 @@ def test_data_validation():
     
     assert game_data.validate_item_data(valid_item) == True
 
+def test_data_cache_rebuilds_when_source_changes(tmp_path):
+    """Test that the compiled cache is used and refreshed on edits"""
+    item_file = tmp_path / "items.txt"
+    with open("data/items.txt") as f:
+        item_file.write_text(f.read())
+
+    items = game_data.load_items(str(item_file), use_cache=True)
+    assert os.path.exists(str(item_file) + game_data.CACHE_SUFFIX)
+    assert game_data.load_items(str(item_file), use_cache=True) == items
+
+    # Editing the text must invalidate the cache
+    item_file.write_text(item_file.read_text().replace("COST: 25", "COST: 30", 1))
+    updated = game_data.load_items(str(item_file), use_cache=True)
+    assert updated == game_data.load_items(str(item_file))
+    assert updated != items
+
+def test_lazy_catalog_matches_loader(tmp_path):
+    """Test that LazyCatalog is a drop-in for the loaded quest dict"""
+    quest_file = tmp_path / "quests.txt"
+    with open("data/quests.txt") as f:
+        quest_file.write_text(f.read())
+
+    quests = game_data.load_quests(str(quest_file))
+    with game_data.LazyCatalog(str(quest_file), "quests") as lazy:
+        assert 'first_steps' in lazy
+        assert lazy._parsed == {}
+        assert lazy['first_steps'] == quests['first_steps']
+        assert dict(lazy) == quests
+
+        char = character_manager.create_character("LazyTest", "Warrior")
+        assert quest_handler.accept_quest(char, 'first_steps', lazy) == True
+
+    # Second open reuses the saved index
+    assert os.path.exists(str(quest_file) + game_data.INDEX_SUFFIX)
+    with game_data.LazyCatalog(str(quest_file), "quests") as lazy:
+        assert list(lazy) == list(quests)
+
+def test_sharded_item_loading(tmp_path):
+    """Test that item shards are merged and duplicate IDs are rejected"""
+    with open("data/items.txt") as f:
+        blocks = f.read().strip().split("\n\n")
+    (tmp_path / "a.txt").write_text("\n\n".join(blocks[:4]))
+    (tmp_path / "b.txt").write_text("\n\n".join(blocks[4:]))
+
+    items, timings = game_data.load_item_shards(str(tmp_path), workers=2)
+    assert items == game_data.load_items("data/items.txt")
+    assert sorted(timings) == [str(tmp_path / "a.txt"), str(tmp_path / "b.txt")]
+
+    (tmp_path / "c.txt").write_text(blocks[0])
+    with pytest.raises(game_data.InvalidDataFormatError):
+        game_data.load_item_shards(str(tmp_path / "*.txt"), workers=1)
+
+def test_catalog_watcher_reparses_only_changes(tmp_path):
+    """Test that hot reload swaps in edited blocks and keeps the rest"""
+    item_file = tmp_path / "items.txt"
+    with open("data/items.txt") as f:
+        item_file.write_text(f.read())
+
+    watcher = game_data.CatalogWatcher(str(item_file), "items")
+    before = watcher.snapshot
+    assert watcher.poll() == False
+
+    item_file.write_text(item_file.read_text().replace("COST: 100", "COST: 120", 1))
+    os.utime(item_file, ns=(0, 1))
+    assert watcher.poll() == True
+    assert watcher.last_reparsed == 1
+    assert watcher['iron_sword']['cost'] == 120
+    assert before['iron_sword']['cost'] == 100
+    assert watcher['health_potion'] is before['health_potion']
+
+    # A broken edit keeps the last good catalog
+    item_file.write_text("ITEM_ID: broken\n")
+    assert watcher.poll() == False
+    assert watcher.last_error is not None
+    assert watcher['iron_sword']['cost'] == 120
+
+    item_file.unlink()
+    assert watcher.poll() == False
+    assert isinstance(watcher.last_error, MissingDataFileError)
+    with pytest.raises(MissingDataFileError):
+        game_data.CatalogWatcher(str(item_file), "items")
+
+def test_record_catalogs_work_with_game_modules():
+    """Test that slotted records can stand in for quest and item dicts"""
+    quests = game_data.load_quests("data/quests.txt", as_records=True)
+    items = game_data.load_items("data/items.txt", as_records=True)
+    assert quests == game_data.load_quests("data/quests.txt")
+    assert isinstance(items['health_potion'], game_data.ItemRecord)
+
+    char = character_manager.create_character("RecordTest", "Cleric")
+    quest_handler.accept_quest(char, 'first_steps', quests)
+    quest_handler.complete_quest(char, 'first_steps', quests)
+    inventory_system.purchase_item(char, 'health_potion', items['health_potion'])
+    result = inventory_system.use_item(char, 'health_potion', items['health_potion'])
+    assert items['health_potion'].get('name') in result
+
+def test_sqlite_catalog_store(tmp_path):
+    """Test that the SQLite catalog matches the loaders and pushes filters down"""
+    import catalog_store
+
+    db_file = str(tmp_path / "catalog.db")
+    counts = catalog_store.compile_catalog_db(db_file, "data/quests.txt", "data/items.txt")
+    quests = game_data.load_quests("data/quests.txt")
+    items = game_data.load_items("data/items.txt")
+    assert counts == {'quests': len(quests), 'items': len(items)}
+
+    with catalog_store.QuestStore(db_file) as quest_store, \
+         catalog_store.ItemStore(db_file) as item_store:
+        assert dict(quest_store) == quests
+        assert dict(item_store) == items
+        assert quest_handler.get_quests_by_level(quest_store, 2, 3) == \
+            quest_handler.get_quests_by_level(quests, 2, 3)
+        assert inventory_system.get_shop_items(item_store, "consumable", 50) == \
+            inventory_system.get_shop_items(items, "consumable", 50)
+
+
+def _shared_quest_titles(path):
+    """Worker side of the shared catalog test"""
+    import shared_catalog
+    with shared_catalog.SharedCatalog(path) as quests:
+        return {quest_id: quests[quest_id]['title'] for quest_id in quests}
+
+
+def test_shared_catalog_attaches_without_parsing(tmp_path, monkeypatch):
+    """Test that a published catalog reads the same in this and other processes"""
+    import shared_catalog
+    from concurrent.futures import ProcessPoolExecutor
+
+    quests_path, items_path = shared_catalog.publish_game_data(
+        str(tmp_path), "data/quests.txt", "data/items.txt")
+    quests = game_data.load_quests("data/quests.txt")
+    items = game_data.load_items("data/items.txt")
+
+    with shared_catalog.SharedCatalog(quests_path) as shared_quests, \
+         shared_catalog.SharedCatalog(items_path) as shared_items:
+        assert dict(shared_quests) == quests
+        assert dict(shared_items) == items
+        assert list(shared_items) == list(items)
+        assert "no_such_item" not in shared_items
+        assert quest_handler.get_quests_by_level(shared_quests, 1, 3) == \
+            quest_handler.get_quests_by_level(quests, 1, 3)
+
+        #Changing a returned record doesn't touch the shared data
+        item_id = next(iter(shared_items))
+        shared_items[item_id]['cost'] = -1
+        assert shared_items[item_id] == items[item_id]
+        shared_items.values()[0]['cost'] = -1
+        assert shared_items.values() == list(items.values())
+
+        #Records are unpickled once per process, later reads copy them
+        loads, real_loads = [], pickle.loads
+        monkeypatch.setattr(shared_catalog.pickle, "loads",
+                            lambda data: loads.append(data) or real_loads(data))
+        shared_items.values()
+        shared_items[item_id]
+        assert loads == []
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(_shared_quest_titles, [quests_path, quests_path]))
+    assert results == [{quest_id: quest['title'] for quest_id, quest in quests.items()}] * 2
+
+    with pytest.raises(CorruptedDataError):
+        shared_catalog.SharedCatalog("data/quests.txt")
+
+# Valid blocks the fuzzer starts from before mutating them
+FUZZ_BLOCKS = {
+    "QUEST_ID": [("TITLE", "Quest"), ("DESCRIPTION", "Go: now"), ("REWARD_XP", "50"),
+                 ("REWARD_GOLD", "25"), ("REQUIRED_LEVEL", "1"), ("PREREQUISITE", "NONE")],
+    "ITEM_ID": [("NAME", "Potion"), ("TYPE", "consumable"), ("EFFECT", "health:20"),
+                ("COST", "25"), ("DESCRIPTION", "Heals: a bit")],
+}
+FUZZ_KEYS = ["TYPE", "Quest_Id", " cost", "Ünïcode", "EXTRA", "REWARD_XP"]
+FUZZ_VALUES = ["1", " 7 ", "-3", "1_000", "x", "", "weapon", "strength:5",
+               "health:20,magic:3", "magic:", "café", "\u0661\u0662", "tab\tbed",
+               "9" * 4300, "9" * 4301, "-" + "9" * 4301, "health:" + "9" * 4301]
+FUZZ_SEPARATORS = [":", " : ", ":  ", " ", ":\t"]
+FUZZ_PADDING = [" ", "\t", "\x0b", "\x1c", "\xa0", "\u2028"]
+FUZZ_NEWLINES = ["\n", "\r\n", "\r"]
+
+
+def _fuzz_catalog(rng, id_key, mutation_rate):
+    """Build a random catalog file, breaking lines now and then"""
+    lines = []
+    for _ in range(rng.randint(0, 4)):
+        fields = [(id_key, f"{id_key.lower()}{rng.randint(0, 3)}")] + FUZZ_BLOCKS[id_key]
+        for key, value in fields:
+            separator = ": "
+            if rng.random() < mutation_rate:
+                mutation = rng.randrange(5)
+                if mutation == 0:
+                    continue
+                if mutation == 1:
+                    key = rng.choice(FUZZ_KEYS)
+                elif mutation == 2:
+                    value = rng.choice(FUZZ_VALUES)
+                elif mutation == 3:
+                    separator = rng.choice(FUZZ_SEPARATORS)
+                else:
+                    padding = rng.choice(FUZZ_PADDING)
+                    key, value = padding + key, value + padding
+            lines.append(key + separator + value)
+        # Usually a blank line between blocks, sometimes none or a blank-looking one
+        lines.extend(rng.choice(["", "", "", " ", "\t", "\x0b"])
+                     for _ in range(rng.choice([0, 1, 1, 1, 2])))
+    newline = rng.choice(FUZZ_NEWLINES)
+    return newline.join(lines)
+
+
+def _outcome(load, filename):
+    """Result of a loader, or the details of the error it raised"""
+    try:
+        return load(filename)
+    except game_data.DataError as e:
+        return (type(e), str(e), getattr(e, 'line_number', None))
+
+
+def test_fast_parser_matches_reference_parser(tmp_path):
+    """Differential test of the bytes parser against iter_quests/iter_items"""
+    rng = random.Random(163)
+    filename = str(tmp_path / "fuzz.txt")
+    cases = [
+        ("QUEST_ID", game_data.fast_load_quests,
+         lambda f: {q['quest_id']: q for q in game_data.iter_quests(f)}),
+        ("ITEM_ID", game_data.fast_load_items,
+         lambda f: {i['item_id']: i for i in game_data.iter_items(f)}),
+    ]
+    for _ in range(400):
+        for id_key, fast, reference in cases:
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                f.write(_fuzz_catalog(rng, id_key, rng.choice([0.0, 0.02, 0.1])))
+            assert _outcome(fast, filename) == _outcome(reference, filename)
+
+    # Numbers too long for int() fail like in the reference parser
+    for digits in [4300, 4301]:
+        for id_key, fast, reference in cases:
+            blocks = {"QUEST_ID": "QUEST_ID: q\nTITLE: T\nDESCRIPTION: D\nREWARD_XP: {}\n"
+                                  "REWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n",
+                      "ITEM_ID": "ITEM_ID: i\nNAME: N\nTYPE: weapon\nEFFECT: strength:{}\n"
+                                 "COST: 1\nDESCRIPTION: D\n"}
+            with open(filename, "w", encoding="utf-8", newline="") as f:
+                f.write(blocks[id_key].format("7" * digits))
+            assert _outcome(fast, filename) == _outcome(reference, filename)
+
+    # Real data files too
+    assert game_data.fast_load_quests("data/quests.txt") == \
+        {q['quest_id']: q for q in game_data.iter_quests("data/quests.txt")}
+
+def test_loaded_catalogs_share_strings():
+    """Test that repeated keys and values are stored once"""
+    items = game_data.load_items("data/items.txt")
+    potions = [items['health_potion'], items['super_health_potion']]
+    assert potions[0]['type'] is potions[1]['type']
+
+    quests = game_data.load_quests("data/quests.txt")
+    assert quests['goblin_hunter']['prerequisite'] is quests['equipment_upgrade']['prerequisite']
+
+    report = game_data.string_pool_report(items)
+    assert report['bytes_saved'] > 0
+    assert report['bytes_used'] + report['bytes_saved'] == report['bytes_if_copied']
+
 # ============================================================================
 # FULL GAME WORKFLOW TEST
 # ============================================================================
@@ -143,6 +143,19 @@ def test_main_functions_exist():
         assert hasattr(main, func_name)
         assert callable(getattr(main, func_name))
 
+# Test main lazy start helpers
+def test_main_lazy_module_imports_on_first_use():
+    """Test that LazyModule only imports when an attribute is used"""
+    import main
+    
+    lazy = main.LazyModule("quest_handler")
+    assert lazy._module is None
+    assert callable(lazy.accept_quest)
+    assert lazy._module is not None
+    
+    options = main.parse_args(["--lazy-start", "--profile-startup"])
+    assert options.lazy_start and options.profile_startup
+
 # Test data files exist
 def test_data_directory_structure():
     """Test that required data directories exist"""